@@ -0,0 +1,77 @@
+"""
+Helpers for benchmarks that drive both services in-process.
+
+The apps run under their own lifespans behind httpx's ASGI transport, so
+requests exercise the real routers, dependencies and database (set
+DATABASE_URL) without a server or network hop in between.
+"""
+import statistics
+import uuid
+from contextlib import asynccontextmanager
+import httpx
+from sqlalchemy import text
+
+
+@asynccontextmanager
+async def service_clients(wrap=None):
+    """
+    (auth client, customer client) for the two apps, started and stopped
+    around the block. `wrap(app)` may return an ASGI app to put in front
+    of each, e.g. to replay a per-request cost the services used to pay.
+    """
+    from microservices.auth_services.main import app as auth
+    from microservices.customer_services.main import app as customer
+
+    wrap = wrap or (lambda app: app)
+    async with auth.router.lifespan_context(auth), customer.router.lifespan_context(customer):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(wrap(auth)), base_url="http://bench") as auth_client, \
+                httpx.AsyncClient(transport=httpx.ASGITransport(wrap(customer)), base_url="http://bench") as customer_client:
+            yield auth_client, customer_client
+
+
+class Owner:
+    """A throwaway owner with one restaurant and menu; remove() deletes them again."""
+
+    def __init__(self, email: str, password: str, headers: dict, restaurant_id: int, menu: list):
+        self.email = email
+        self.password = password
+        self.headers = headers
+        self.restaurant_id = restaurant_id
+        self.menu = menu
+
+    @classmethod
+    async def create(cls, auth_client, customer_client, items: int = 20) -> "Owner":
+        email = f"bench-{uuid.uuid4().hex[:12]}@example.com"
+        password = "benchmark"
+        response = await auth_client.post("/auth/register", json={"name": "Bench", "email": email, "password": password})
+        response.raise_for_status()
+        response = await auth_client.post("/auth/login", json={"email": email, "password": password})
+        response.raise_for_status()
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        response = await customer_client.post("/order/restaurants-with-menu", headers=headers, json={
+            "name": "Benchmark bistro",
+            "menu_items": [{"name": f"Dish {i}", "price": 9.5 + i % 10} for i in range(items)],
+        })
+        response.raise_for_status()
+        restaurant_id = response.json()["restaurant_id"]
+        # Log in again so the token's rids claim includes the new restaurant
+        response = await auth_client.post("/auth/login", json={"email": email, "password": password})
+        response.raise_for_status()
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        menu = (await customer_client.get(f"/order/menu-items/{restaurant_id}")).json()
+        return cls(email, password, headers, restaurant_id, menu)
+
+    async def remove(self, engine):
+        async with engine.begin() as conn:
+            # Menu items, orders and the sales rollup cascade from the restaurant
+            await conn.execute(text("DELETE FROM app.restaurants WHERE id = :rid"), {"rid": self.restaurant_id})
+            await conn.execute(text("DELETE FROM app.users WHERE email = :email"), {"email": self.email})
+
+
+def summarize(timings_ms: list[float]) -> str:
+    timings_ms = sorted(timings_ms)
+    return (
+        f"median {statistics.median(timings_ms):8.2f} ms  "
+        f"p95 {timings_ms[int(len(timings_ms) * 0.95)]:8.2f} ms  "
+        f"p99 {timings_ms[min(len(timings_ms) - 1, int(len(timings_ms) * 0.99))]:8.2f} ms"
+    )
@@ -0,0 +1,92 @@
+"""
+Fan-out latency of order events to live subscribers.
+
+Subscribes N consumers (think kitchen screens and customer phones) to one
+restaurant topic and publishes events one at a time, each after the
+previous one reached every consumer. Reports the delay from publish to
+each consumer dequeuing the event and to the last consumer getting it. The
+in-process backend needs no database; `postgres` relays through
+LISTEN/NOTIFY and needs DATABASE_URL:
+
+    python -m benchmarks.event_fanout [subscribers] [events] [memory|postgres]
+"""
+import asyncio
+import statistics
+import sys
+import time
+from microservices.customer_services.events import (
+    Broadcaster,
+    PostgresNotifyBackend,
+    restaurant_topic,
+)
+
+
+class Tally:
+    def __init__(self, subscribers: int):
+        self.subscribers = subscribers
+        self.delays = []
+        self.last = []
+        self.sent = 0.0
+        self.received = 0
+        self.done = asyncio.Event()
+
+    def record(self):
+        delay = time.perf_counter() - self.sent
+        self.delays.append(delay)
+        self.received += 1
+        if self.received == self.subscribers:
+            self.last.append(delay)
+            self.done.set()
+
+
+async def consume(subscription, events: int, tally: Tally):
+    for _ in range(events):
+        if await subscription.get(timeout=10) is None:
+            return
+        tally.record()
+
+
+async def run(subscribers: int, events: int, backend: str):
+    manager = None
+    if backend == "postgres":
+        from database.db_manager import AsyncDatabaseManager
+
+        manager = AsyncDatabaseManager()
+        broadcaster = Broadcaster(PostgresNotifyBackend(manager.engine))
+    else:
+        broadcaster = Broadcaster()
+    await broadcaster.start()
+
+    topic = restaurant_topic(1)
+    tally = Tally(subscribers)
+    consumers = [
+        asyncio.create_task(consume(broadcaster.subscribe(topic), events, tally))
+        for _ in range(subscribers)
+    ]
+    await asyncio.sleep(0)
+    for order_id in range(events):
+        tally.received = 0
+        tally.done.clear()
+        tally.sent = time.perf_counter()
+        await broadcaster.publish(topic, "order.status", {"order_id": order_id, "status": "ready"})
+        await asyncio.wait_for(tally.done.wait(), 10)
+    await asyncio.gather(*consumers)
+    await broadcaster.stop()
+    if manager is not None:
+        await manager.dispose()
+
+    print(f"{backend}: {subscribers} subscribers x {events} events")
+    for name, values in (("each delivery", tally.delays), ("last subscriber", tally.last)):
+        values = sorted(value * 1000 for value in values)
+        print(
+            f"  {name:<16} median {statistics.median(values):8.3f} ms  "
+            f"p99 {values[int(len(values) * 0.99)]:8.3f} ms  max {values[-1]:8.3f} ms"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(run(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 500,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 200,
+        sys.argv[3] if len(sys.argv) > 3 else "memory",
+    ))
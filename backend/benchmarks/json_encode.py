@@ -0,0 +1,101 @@
+"""
+Encode throughput of FastJSONResponse against FastAPI's default path.
+
+Renders a menu (items with Decimal prices and timestamps) and a page of
+order history (orders with Decimal totals, timestamps and their lines)
+with FastJSONResponse (orjson through `dumps`), with `dumps`' stdlib
+fallback, and with jsonable_encoder + JSONResponse, which is what a
+handler returning a plain dict goes through. No database needed:
+
+    python -m benchmarks.json_encode [menu items] [orders] [iterations]
+"""
+import datetime
+import json
+import sys
+import time
+from decimal import Decimal
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from microservices.common import responses
+from microservices.common.responses import FastJSONResponse
+
+
+def menu(items: int) -> list[dict]:
+    created = datetime.datetime(2026, 1, 1, 12, 0)
+    return [
+        {
+            "id": i,
+            "restaurant_id": 1,
+            "name": f"Item {i}",
+            "description": "House special with seasonal vegetables",
+            "price": Decimal("12.50") + i,
+            "is_available": i % 7 != 0,
+            "category": {"id": i % 12, "name": f"Category {i % 12}"},
+            "created_at": created,
+        }
+        for i in range(items)
+    ]
+
+
+def order_page(orders: int) -> dict:
+    newest = datetime.datetime(2026, 1, 1, 20, 0)
+    return {
+        "restaurant_id": 1,
+        "orders": [
+            {
+                "order_id": 100_000 - i,
+                "created_at": newest - datetime.timedelta(minutes=7 * i),
+                "table_number": i % 20 + 1,
+                "status": "served",
+                "version": 4,
+                "total_amount": Decimal("12.50") * (i % 5 + 1),
+                "items": [
+                    {"menu_item_id": (i + line) % 200, "quantity": line % 3 + 1, "price": Decimal("12.50")}
+                    for line in range(i % 5 + 1)
+                ],
+            }
+            for i in range(orders)
+        ],
+        "next_cursor": "MjAyNi0wMS0wMVQxMjowMDowMHw5OTk1MA",
+    }
+
+
+def stdlib_dumps(content) -> bytes:
+    return json.dumps(content, default=responses._default, separators=(",", ":")).encode()
+
+
+def compare(label: str, payload, iterations: int):
+    encoders = {
+        "FastJSONResponse (orjson)": lambda: FastJSONResponse(payload).body,
+        "dumps, stdlib fallback": lambda: stdlib_dumps(payload),
+        "jsonable_encoder + JSONResponse": lambda: JSONResponse(jsonable_encoder(payload)).body,
+    }
+    if responses.orjson is None:
+        del encoders["FastJSONResponse (orjson)"]
+        print("orjson not installed; FastJSONResponse uses the stdlib fallback")
+    baseline = None
+    print(f"{label}, {len(stdlib_dumps(payload))} bytes")
+    for name, encode in encoders.items():
+        encode()
+        start = time.perf_counter()
+        for _ in range(iterations):
+            body = encode()
+        elapsed = (time.perf_counter() - start) / iterations
+        baseline = baseline or elapsed
+        print(
+            f"  {name:<32} {elapsed * 1e3:8.3f} ms/response  "
+            f"{len(body) / elapsed / 1e6:7.1f} MB/s  ({elapsed / baseline:.1f}x)"
+        )
+
+
+def run(items: int, orders: int, iterations: int):
+    compare(f"{items} menu items", menu(items), iterations)
+    compare(f"order history page of {orders} orders", order_page(orders), iterations)
+
+
+if __name__ == "__main__":
+    run(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 200,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 50,
+        int(sys.argv[3]) if len(sys.argv) > 3 else 500,
+    )
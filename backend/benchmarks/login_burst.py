@@ -0,0 +1,80 @@
+"""
+Login latency during a shift-change burst, bcrypt inline against the pool.
+
+Fires a burst of concurrent POST /auth/login requests while another client
+calls GET /auth/me (token claims only, no database) every 20 ms, and
+reports the p50/p99 of both:
+- "inline" is the old login handler, where verify_password ran on the
+  event loop and every other request waited behind each bcrypt check
+- "hash pool" is login as it is now, with bcrypt on the bounded thread pool
+The work factor is BCRYPT_ROUNDS from the environment (default 12), as in
+the service. Needs a migrated database:
+
+    DATABASE_URL=postgresql+asyncpg://... python -m benchmarks.login_burst [logins]
+"""
+import asyncio
+import sys
+import time
+from database.db_manager import get_db_manager
+from microservices.auth_services import router as auth_router
+from microservices.auth_services.utils import BCRYPT_ROUNDS, PASSWORD_HASH_WORKERS, verify_password
+from benchmarks.common import Owner, service_clients, summarize
+
+PROBE_INTERVAL = 0.02
+
+
+async def verify_inline(plain_password: str, hashed_password: str) -> bool:
+    return verify_password(plain_password, hashed_password)
+
+
+async def timed(call, timings: list):
+    start = time.perf_counter()
+    response = await call()
+    timings.append((time.perf_counter() - start) * 1000)
+    response.raise_for_status()
+
+
+async def burst(auth_client, owner: Owner, logins: int) -> tuple[list, list]:
+    login = {"email": owner.email, "password": owner.password}
+    login_timings, me_timings = [], []
+    done = asyncio.Event()
+
+    async def probe():
+        # Calls are due every PROBE_INTERVAL and timed from when they were
+        # due, so time spent waiting for a blocked event loop counts
+        due = time.perf_counter()
+        while not done.is_set():
+            await asyncio.sleep(max(0.0, due - time.perf_counter()))
+            response = await auth_client.get("/auth/me", headers=owner.headers)
+            me_timings.append((time.perf_counter() - due) * 1000)
+            response.raise_for_status()
+            due += PROBE_INTERVAL
+
+    prober = asyncio.create_task(probe())
+    await asyncio.gather(*[
+        timed(lambda: auth_client.post("/auth/login", json=login), login_timings) for _ in range(logins)
+    ])
+    done.set()
+    await prober
+    return login_timings, me_timings
+
+
+async def run(logins: int):
+    async with service_clients() as (auth_client, customer_client):
+        owner = await Owner.create(auth_client, customer_client)
+        print(f"{logins} concurrent logins, BCRYPT_ROUNDS={BCRYPT_ROUNDS}, {PASSWORD_HASH_WORKERS} hash workers")
+        pooled = auth_router.verify_password_async
+        for name, verify in (("inline", verify_inline), ("hash pool", pooled)):
+            auth_router.verify_password_async = verify
+            try:
+                login_timings, me_timings = await burst(auth_client, owner, logins)
+            finally:
+                auth_router.verify_password_async = pooled
+            print(f"  {name}")
+            print(f"    POST /auth/login  {summarize(login_timings)}")
+            print(f"    GET /auth/me      {summarize(me_timings)}  ({len(me_timings)} calls during the burst)")
+        await owner.remove(get_db_manager().engine)
+
+
+if __name__ == "__main__":
+    asyncio.run(run(int(sys.argv[1]) if len(sys.argv) > 1 else 40))
@@ -0,0 +1,121 @@
+"""
+Bytes saved by menu ETags for a simulated dining room.
+
+Phones at every table open the menu on arrival and reopen it a few more
+times while they stay. The manager edits the menu a few times during
+service. Every request goes through the real GET /order/menu-items/{id}
+route and cached_json_response via TestClient. menu_cache is replaced by
+an in-memory stub, so nothing reaches the database. Phones that hold an
+ETag send it back in If-None-Match.
+
+This is conservative: a browser inside max-age would not send the
+revalidation at all, and here every reopen is counted as a request.
+
+    python -m benchmarks.menu_bytes_saved [phones] [menu items]
+"""
+import random
+import sys
+from decimal import Decimal
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from microservices.customer_services import router as customer_router
+from microservices.customer_services.http_cache import make_etag
+from microservices.customer_services.menu_cache import CachedPayload
+from microservices.customer_services.schema import MenuCategoryRef, MenuItemOut, menu_items_adapter
+
+RESTAURANT_ID = 1
+SERVICE_MINUTES = 240
+EDITS = 4  # price changes / 86'd dishes during service
+
+
+class StubMenuCache:
+    """Always a hit: serves the current menu, bumping the version on every edit."""
+
+    def __init__(self, items: int):
+        self.items = [
+            MenuItemOut.model_construct(
+                id=i,
+                name=f"Dish {i}",
+                price=Decimal("9.50") + i % 20,
+                description="Slow-cooked with house spices, served with rice and a side salad",
+                image_url=f"https://cdn.example.com/menu/{i}.jpg",
+                is_available=True,
+                category=MenuCategoryRef.model_construct(name=f"Section {i % 8}"),
+            )
+            for i in range(1, items + 1)
+        ]
+        self._version = 0
+        self._render()
+
+    def _render(self):
+        body = menu_items_adapter.dump_json(self.items)
+        self.payload = CachedPayload(body, make_etag(body))
+
+    def edit(self, rng: random.Random):
+        item = rng.choice(self.items)
+        item.is_available = not item.is_available
+        self._version += 1
+        self._render()
+
+    async def version(self, restaurant_id: int) -> int:
+        return self._version
+
+    async def get(self, restaurant_id: int, version: int) -> CachedPayload:
+        return self.payload
+
+
+def visits(phones: int, rng: random.Random) -> list[tuple[float, int]]:
+    """(minute, phone) for every time a phone opens the menu."""
+    schedule = []
+    for phone in range(phones):
+        arrival = rng.uniform(0, SERVICE_MINUTES - 60)
+        stay = rng.uniform(45, 90)
+        schedule.append((arrival, phone))
+        # Reopened while ordering, adding drinks, dessert
+        for _ in range(rng.randint(2, 6)):
+            schedule.append((arrival + rng.uniform(1, stay), phone))
+    return sorted(schedule)
+
+
+def response_bytes(response) -> int:
+    return len(response.content) + sum(len(k) + len(v) + 4 for k, v in response.headers.items())
+
+
+def run(phones: int, items: int):
+    rng = random.Random(7)
+    cache = StubMenuCache(items)
+    customer_router.menu_cache = cache
+    app = FastAPI()
+    app.include_router(customer_router.create_base_router(), prefix="/order")
+    client = TestClient(app)
+
+    edits = sorted(rng.uniform(0, SERVICE_MINUTES) for _ in range(EDITS))
+    etags = {}
+    requests = not_modified = sent = without_etags = 0
+    for minute, phone in visits(phones, rng):
+        while edits and edits[0] <= minute:
+            edits.pop(0)
+            cache.edit(rng)
+        headers = {"If-None-Match": etags[phone]} if phone in etags else {}
+        response = client.get(f"/order/menu-items/{RESTAURANT_ID}", headers=headers)
+        requests += 1
+        sent += response_bytes(response)
+        if response.status_code == 304:
+            not_modified += 1
+        else:
+            etags[phone] = response.headers["etag"]
+        # Without ETags every open downloads the whole menu
+        without_etags += response_bytes(client.get(f"/order/menu-items/{RESTAURANT_ID}"))
+
+    print(f"{phones} phones, {items}-item menu ({len(cache.payload.body)} bytes), {EDITS} edits during service")
+    print(f"  requests          {requests:10d}  ({not_modified} answered 304)")
+    print(f"  without ETags     {without_etags / 1e6:10.2f} MB")
+    print(f"  with ETags        {sent / 1e6:10.2f} MB")
+    print(f"  saved             {(without_etags - sent) / 1e6:10.2f} MB  ({1 - sent / without_etags:.0%})")
+
+
+if __name__ == "__main__":
+    run(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 300,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 120,
+    )
@@ -0,0 +1,138 @@
+"""
+ORM hydration against column-projected row tuples for the menu listing.
+
+Loads menus of 50, 500 and 5,000 items two ways and renders the response
+body each time:
+- "ORM entities" is the old get_menu_items. It runs select(MenuItem) with
+  selectinload(MenuItem.category), copies the fields into dicts with
+  str(price), and renders through jsonable_encoder + json.
+- "row tuples" is the current one. It selects only the response columns
+  joined to menu_categories, builds MenuItemOut.model_construct rows and
+  renders with menu_items_adapter.dump_json.
+
+The tables live in an in-memory SQLite database, with the app schema
+attached, so no server is needed. The absolute numbers leave out network
+time; the gap between the two paths is the Python-side cost:
+
+    python -m benchmarks.menu_hydration [iterations]
+"""
+import json
+import sys
+import time
+from decimal import Decimal
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import create_engine, event, insert, select
+from sqlalchemy.orm import Session, selectinload
+from database.model import MenuCategory, MenuItem, Restaurants
+from microservices.customer_services.schema import MenuCategoryRef, MenuItemOut, menu_items_adapter
+
+SIZES = (50, 500, 5000)
+
+
+def make_engine():
+    engine = create_engine("sqlite://")
+
+    @event.listens_for(engine, "connect")
+    def attach_app_schema(dbapi_connection, record):
+        dbapi_connection.execute("ATTACH DATABASE ':memory:' AS app")
+
+    tables = [Restaurants.__table__, MenuCategory.__table__, MenuItem.__table__]
+    Restaurants.metadata.create_all(engine, tables=tables)
+    return engine
+
+
+def seed(engine, items: int) -> int:
+    with engine.begin() as conn:
+        restaurant_id = conn.execute(insert(Restaurants).values(name=f"{items} items")).inserted_primary_key[0]
+        categories = [
+            conn.execute(insert(MenuCategory).values(name=f"{items}-{i}")).inserted_primary_key[0]
+            for i in range(8)
+        ]
+        conn.execute(insert(MenuItem), [
+            {
+                "restaurant_id": restaurant_id,
+                "category_id": categories[i % 8],
+                "name": f"Dish {i}",
+                "description": "Slow-cooked with house spices, served with rice and a side salad",
+                "price": Decimal("9.50") + i % 20,
+                "image_url": f"https://cdn.example.com/menu/{i}.jpg",
+                "is_available": i % 7 != 0,
+            }
+            for i in range(items)
+        ])
+    return restaurant_id
+
+
+def orm_entities(session, restaurant_id: int) -> bytes:
+    query = select(MenuItem).options(selectinload(MenuItem.category)).where(MenuItem.restaurant_id == restaurant_id)
+    menu_items = session.execute(query).scalars().all()
+    items_response = [
+        {
+            "id": item.id,
+            "name": item.name,
+            "price": str(item.price),
+            "description": item.description,
+            "image_url": item.image_url,
+            "is_available": item.is_available,
+            "category": {"name": item.category.name if item.category else None},
+        }
+        for item in menu_items
+    ]
+    return json.dumps(jsonable_encoder(items_response)).encode()
+
+
+def row_tuples(session, restaurant_id: int) -> bytes:
+    query = (
+        select(
+            MenuItem.id,
+            MenuItem.name,
+            MenuItem.price,
+            MenuItem.description,
+            MenuItem.image_url,
+            MenuItem.is_available,
+            MenuCategory.name,
+        )
+        .outerjoin(MenuCategory, MenuItem.category_id == MenuCategory.id)
+        .where(MenuItem.restaurant_id == restaurant_id)
+        .order_by(MenuItem.id)
+    )
+    items = [
+        MenuItemOut.model_construct(
+            id=item_id,
+            name=name,
+            price=price,
+            description=description,
+            image_url=image_url,
+            is_available=is_available,
+            category=MenuCategoryRef.model_construct(name=category_name),
+        )
+        for item_id, name, price, description, image_url, is_available, category_name in session.execute(query)
+    ]
+    return menu_items_adapter.dump_json(items)
+
+
+def timed(engine, fn, restaurant_id: int, iterations: int) -> float:
+    elapsed = 0.0
+    for _ in range(iterations):
+        # A fresh session per request, as in the handler
+        with Session(engine) as session:
+            start = time.perf_counter()
+            fn(session, restaurant_id)
+            elapsed += time.perf_counter() - start
+    return elapsed / iterations * 1000
+
+
+def run(iterations: int):
+    engine = make_engine()
+    for size in SIZES:
+        restaurant_id = seed(engine, size)
+        rounds = max(3, iterations * 50 // size)
+        with Session(engine) as session:
+            assert len(json.loads(orm_entities(session, restaurant_id))) == size
+        orm = timed(engine, orm_entities, restaurant_id, rounds)
+        rows = timed(engine, row_tuples, restaurant_id, rounds)
+        print(f"{size:5d} items   ORM entities {orm:8.2f} ms   row tuples {rows:8.2f} ms   ({orm / rows:.1f}x)")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 100)
@@ -0,0 +1,104 @@
+"""
+Order history page latency deep into a year of orders, keyset against OFFSET.
+
+Seeds a year of orders for one busy restaurant (500k by default, two lines
+each) inside a transaction that is rolled back at the end, then times
+pages 1, 10, 100, 1000 and 5000 of 50 orders:
+- "OFFSET" is the same query and batched item lookup with OFFSET
+  (page - 1) * 50, which reads and throws away every earlier row
+- "keyset" is load_order_page with the cursor of the previous page, as the
+  order history endpoint serves it
+Needs a migrated database:
+
+    DATABASE_URL=postgresql+asyncpg://... python -m benchmarks.order_pages [orders]
+"""
+import asyncio
+import datetime
+import statistics
+import sys
+import time
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from database.db_manager import AsyncDatabaseManager
+from database.model import OrderItem
+from database.model.orders import Orders
+from database.partitions import add_months, ensure_partitions, month_start
+from microservices.customer_services.order_history import load_order_page
+
+PAGE_SIZE = 50
+PAGES = (1, 10, 100, 1000, 5000)
+RUNS = 20
+
+
+async def offset_page(session, restaurant_id: int, limit: int, page: int):
+    """load_order_page's queries, paged with OFFSET instead of a cursor."""
+    orders = (await session.execute(
+        select(Orders.id, Orders.created_at, Orders.table_number, Orders.status, Orders.version, Orders.total_amount)
+        .where(Orders.restaurant_id == restaurant_id)
+        .order_by(Orders.created_at.desc(), Orders.id.desc())
+        .offset((page - 1) * limit)
+        .limit(limit)
+    )).all()
+    if orders:
+        await session.execute(
+            select(OrderItem.order_id, OrderItem.menu_item_id, OrderItem.quantity, OrderItem.price)
+            .where(
+                OrderItem.order_id.in_([order.id for order in orders]),
+                OrderItem.order_created_at.between(orders[-1].created_at, orders[0].created_at),
+            )
+            .order_by(OrderItem.order_id, OrderItem.id)
+        )
+    return orders
+
+
+async def median_ms(call) -> float:
+    timings = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        await call()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+async def run(orders: int):
+    manager = AsyncDatabaseManager(statement_timeout_ms=0)
+    async with manager.engine.connect() as conn:
+        tx = await conn.begin()
+        today = datetime.date.today()
+        await conn.run_sync(lambda c: ensure_partitions(c, add_months(month_start(today), -12), today))
+        rid = (await conn.execute(text("INSERT INTO app.restaurants (name) VALUES ('benchmark') RETURNING id"))).scalar()
+        item = (await conn.execute(text(
+            "INSERT INTO app.menu_items (restaurant_id, name, price, is_available) "
+            "VALUES (:rid, 'Dish', 10, true) RETURNING id"
+        ), {"rid": rid})).scalar()
+        await conn.execute(text(
+            "INSERT INTO app.orders (restaurant_id, table_number, total_amount, status, created_at) "
+            "SELECT :rid, g % 20, 20, 'served', now() - make_interval(secs => g * CAST(:step AS float8)) "
+            "FROM generate_series(1, :n) g"
+        ), {"rid": rid, "n": orders, "step": 365 * 24 * 3600 / orders})
+        await conn.execute(text(
+            "INSERT INTO app.order_items (order_id, order_created_at, menu_item_id, quantity, price) "
+            "SELECT o.id, o.created_at, :item, 1, 10 FROM app.orders o, generate_series(1, 2) "
+            "WHERE o.restaurant_id = :rid"
+        ), {"rid": rid, "item": item})
+        await conn.execute(text("ANALYZE app.orders"))
+        await conn.execute(text("ANALYZE app.order_items"))
+
+        session = AsyncSession(bind=conn, join_transaction_mode="create_savepoint")
+        cursors, cursor = {1: None}, None
+        for page in range(2, max(PAGES) + 1):
+            _, _, cursor = await load_order_page(session, rid, PAGE_SIZE, cursor)
+            cursors[page] = cursor
+
+        print(f"{orders} orders over 12 months, median of {RUNS} runs, {PAGE_SIZE} orders per page")
+        for page in PAGES:
+            offset = await median_ms(lambda: offset_page(session, rid, PAGE_SIZE, page))
+            keyset = await median_ms(lambda: load_order_page(session, rid, PAGE_SIZE, cursors[page]))
+            print(f"  page {page:5d}   OFFSET {offset:8.2f} ms   keyset {keyset:6.2f} ms")
+        await session.close()
+        await tx.rollback()
+    await manager.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(run(int(sys.argv[1]) if len(sys.argv) > 1 else 500_000))
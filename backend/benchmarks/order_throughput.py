@@ -0,0 +1,118 @@
+"""
+Order placement throughput, before and after single-transaction inserts.
+
+Concurrent tables post orders for a fixed time and the script reports
+orders/s and latency for two handlers:
+- "before" replays the old post_orders. It checks items with SELECT ... IN,
+  inserts the order, commits, refreshes it, inserts the items and commits
+  again. It is adapted only as far as the current schema requires:
+  order_items now carries order_created_at.
+- "after" is the current POST /order/orders. It prices orders from the
+  cached index, runs one INSERT ... RETURNING and one multi-row INSERT
+  (plus the sales rollup upsert), and commits once.
+The old per-request schema check is left out of "before"; the
+request_latency benchmark covers it. Needs a migrated database:
+
+    DATABASE_URL=postgresql+asyncpg://... python -m benchmarks.order_throughput [tables] [seconds]
+"""
+import asyncio
+import random
+import sys
+import time
+import httpx
+from fastapi import FastAPI, HTTPException
+from sqlalchemy import select
+from database.db_manager import get_db_manager
+from database.model import OrderItem
+from database.model.menu_items import MenuItem
+from database.model.orders import Orders
+from microservices.customer_services.schema import OrderRequestBody
+from benchmarks.common import Owner, service_clients, summarize
+
+db_manager = get_db_manager()
+legacy = FastAPI()
+
+
+@legacy.post("/order/orders")
+async def post_orders(request: OrderRequestBody):
+    async_session = await db_manager.get_session()
+    async with async_session() as session:
+        menu_item_ids = [item.menu_item_id for item in request.order_items]
+        result = await session.execute(select(MenuItem).where(MenuItem.id.in_(menu_item_ids)))
+        existing_items = result.scalars().all()
+        if len(existing_items) != len(set(menu_item_ids)):
+            raise HTTPException(status_code=400, detail="One or more menu items not found")
+        prices = {item.id: item.price for item in existing_items}
+
+        new_order = Orders(
+            restaurant_id=request.restaurant_id,
+            table_number=request.table_number,
+            total_amount=sum(prices[item.menu_item_id] * item.quantity for item in request.order_items),
+            status="pending",
+        )
+        session.add(new_order)
+        await session.commit()
+        await session.flush()
+        await session.refresh(new_order)
+
+        order_items = [
+            OrderItem(
+                order_id=new_order.id,
+                order_created_at=new_order.created_at,
+                menu_item_id=item.menu_item_id,
+                quantity=item.quantity,
+                price=prices[item.menu_item_id],
+            )
+            for item in request.order_items
+        ]
+        session.add_all(order_items)
+        await session.commit()
+        return {
+            "order_id": new_order.id,
+            "created_at": new_order.created_at,
+            "status": new_order.status,
+            "items_count": len(order_items),
+        }
+
+
+async def table(client, owner: Owner, number: int, deadline: float, timings: list):
+    rng = random.Random(number)
+    while time.perf_counter() < deadline:
+        body = {
+            "restaurant_id": owner.restaurant_id,
+            "table_number": number,
+            "order_items": [
+                {"menu_item_id": item["id"], "quantity": rng.randint(1, 3)}
+                for item in rng.sample(owner.menu, rng.randint(1, 5))
+            ],
+        }
+        start = time.perf_counter()
+        response = await client.post("/order/orders", json=body)
+        timings.append((time.perf_counter() - start) * 1000)
+        response.raise_for_status()
+
+
+async def load(client, owner: Owner, tables: int, seconds: float) -> list[float]:
+    timings = []
+    deadline = time.perf_counter() + seconds
+    await asyncio.gather(*[table(client, owner, number, deadline, timings) for number in range(1, tables + 1)])
+    return timings
+
+
+async def run(tables: int, seconds: float):
+    async with service_clients() as (auth_client, customer_client):
+        owner = await Owner.create(auth_client, customer_client)
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(legacy), base_url="http://bench") as legacy_client:
+            print(f"{tables} tables ordering concurrently for {seconds:g}s each")
+            for name, client in (("before", legacy_client), ("after", customer_client)):
+                await load(client, owner, tables, 1)  # warm up
+                timings = await load(client, owner, tables, seconds)
+                print(f"  {name:<7} {len(timings) / seconds:8.1f} orders/s   {summarize(timings)}")
+        await owner.remove(db_manager.engine)
+
+
+if __name__ == "__main__":
+    asyncio.run(run(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 20,
+        float(sys.argv[2]) if len(sys.argv) > 2 else 10,
+    ))
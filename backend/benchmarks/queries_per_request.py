@@ -0,0 +1,77 @@
+"""
+SQL statements per authenticated request, with and without the user lookup.
+
+Counts every statement the services send (a before_cursor_execute listener
+on the shared engine) while an owner calls GET /auth/me, the order history
+and the sales report, in three setups:
+- "user query per request" is the old get_current_user: a token with only
+  `sub`, resolved against app.users on every call (the user cache is
+  cleared before each request)
+- "legacy token, cached" is the same token with the short-TTL user cache
+- "uid/rids claims" is a token as /auth/login issues it now
+Needs a migrated database:
+
+    DATABASE_URL=postgresql+asyncpg://... python -m benchmarks.queries_per_request [requests]
+"""
+import asyncio
+import sys
+from sqlalchemy import event
+from database.db_manager import get_db_manager
+from microservices.auth_services import router as auth_router
+from microservices.common.auth import create_access_token
+from microservices.customer_services import router as customer_router
+from benchmarks.common import Owner, service_clients
+
+
+class StatementCounter:
+    def __init__(self, sync_engine):
+        self.count = 0
+        event.listen(sync_engine, "before_cursor_execute", self._count)
+
+    def _count(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+
+def clear_user_caches():
+    auth_router.user_cache._entries.clear()
+    customer_router.user_cache._entries.clear()
+
+
+async def run(requests: int):
+    engine = get_db_manager().engine
+    counter = StatementCounter(engine.sync_engine)
+    async with service_clients() as (auth_client, customer_client):
+        owner = await Owner.create(auth_client, customer_client)
+        rid = owner.restaurant_id
+        await customer_client.post("/order/orders", json={
+            "restaurant_id": rid,
+            "table_number": 1,
+            "order_items": [{"menu_item_id": item["id"], "quantity": 1} for item in owner.menu[:3]],
+        })
+        legacy = {"Authorization": f"Bearer {create_access_token({'sub': owner.email})}"}
+        endpoints = {
+            "GET /auth/me": (auth_client, "/auth/me"),
+            "GET /order/restaurants/{id}/orders": (customer_client, f"/order/restaurants/{rid}/orders"),
+            "GET /order/restaurants/{id}/reports/sales": (customer_client, f"/order/restaurants/{rid}/reports/sales"),
+        }
+        setups = {
+            "user query per request": (legacy, clear_user_caches),
+            "legacy token, cached": (legacy, lambda: None),
+            "uid/rids claims": (owner.headers, lambda: None),
+        }
+        print(f"statements per request, averaged over {requests} requests")
+        for endpoint, (client, url) in endpoints.items():
+            print(f"  {endpoint}")
+            for name, (headers, before_request) in setups.items():
+                clear_user_caches()
+                (await client.get(url, headers=headers)).raise_for_status()  # warm up
+                counter.count = 0
+                for _ in range(requests):
+                    before_request()
+                    (await client.get(url, headers=headers)).raise_for_status()
+                print(f"    {name:<24} {counter.count / requests:5.2f}")
+        await owner.remove(engine)
+
+
+if __name__ == "__main__":
+    asyncio.run(run(int(sys.argv[1]) if len(sys.argv) > 1 else 100))
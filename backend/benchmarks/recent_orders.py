@@ -0,0 +1,148 @@
+"""
+Latency of the app's own order queries on partitioned app.orders at scale.
+
+Seeds a year of orders (50M by default) spread over many restaurants
+inside a transaction that is rolled back at the end. It then times the
+functions the app actually calls for one of those restaurants:
+- load_order_page, the first page and a page deep in the history
+- load_order_status, the id-only lookup behind the order WebSocket
+- transition_orders, a bulk status change by id
+For each one it runs the captured statements under EXPLAIN ANALYZE and
+reports how many monthly partitions the plan contains and how many were
+actually executed. Needs a migrated database, and tens of GB of disk at
+the default scale:
+
+    DATABASE_URL=postgresql+asyncpg://... python -m benchmarks.recent_orders [orders] [restaurants]
+"""
+import asyncio
+import datetime
+import json
+import statistics
+import sys
+import time
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from database.db_manager import AsyncDatabaseManager
+from database.partitions import add_months, ensure_partitions, month_start
+from microservices.customer_services.order_history import load_order_page
+from microservices.customer_services.order_status import load_order_status, transition_orders
+
+RUNS = 50
+
+
+def _partitions(plan: dict, found: dict):
+    """{partition: executed} for every orders partition in a plan tree."""
+    name = plan.get("Relation Name", "")
+    if name.startswith("orders_p"):
+        found[name] = found.get(name, False) or plan.get("Actual Loops", 0) > 0
+    for child in plan.get("Plans", []):
+        _partitions(child, found)
+    return found
+
+
+class StatementCapture:
+    """Records the statements a block of app code sends, to EXPLAIN them afterwards."""
+
+    def __init__(self, sync_engine):
+        self.statements = []
+        self.active = False
+        event.listen(sync_engine, "before_cursor_execute", self._record)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        if self.active and "app.orders" in statement:
+            self.statements.append((statement, parameters))
+
+
+async def explain(conn, capture: StatementCapture, call) -> str:
+    capture.statements.clear()
+    capture.active = True
+    nested = await conn.begin_nested()
+    try:
+        await call()
+    finally:
+        capture.active = False
+        await nested.rollback()
+    found = {}
+    for statement, parameters in capture.statements:
+        nested = await conn.begin_nested()
+        plan = (await conn.exec_driver_sql(f"EXPLAIN (ANALYZE, FORMAT JSON) {statement}", parameters)).scalar()
+        await nested.rollback()
+        plan = json.loads(plan) if isinstance(plan, str) else plan
+        _partitions(plan[0]["Plan"], found)
+    return f"partitions in plan {len(found):2d}, executed {sum(found.values()):2d}"
+
+
+async def timed(conn, call) -> list[float]:
+    timings = []
+    for _ in range(RUNS):
+        # Each run is undone, so transitions find the same pending orders
+        nested = await conn.begin_nested()
+        start = time.perf_counter()
+        await call()
+        timings.append((time.perf_counter() - start) * 1000)
+        await nested.rollback()
+    return sorted(timings)
+
+
+async def run(orders: int, restaurants: int):
+    manager = AsyncDatabaseManager(statement_timeout_ms=0)
+    capture = StatementCapture(manager.engine.sync_engine)
+    async with manager.engine.connect() as conn:
+        tx = await conn.begin()
+        today = datetime.date.today()
+        await conn.run_sync(lambda c: ensure_partitions(c, add_months(month_start(today), -12), today))
+        rids = list((await conn.execute(
+            text("INSERT INTO app.restaurants (name) SELECT 'benchmark ' || g FROM generate_series(1, :n) g RETURNING id"),
+            {"n": restaurants},
+        )).scalars())
+
+        # Evenly over the last 365 days, restaurants round-robin; the newest
+        # 0.1% are still pending
+        started = time.perf_counter()
+        await conn.execute(text(
+            "INSERT INTO app.orders (restaurant_id, table_number, total_amount, status, created_at) "
+            "SELECT (CAST(:rids AS int[]))[1 + g % :r], g % 20, 10, "
+            "CASE WHEN g <= :pending THEN 'pending' ELSE 'served' END, "
+            "now() - make_interval(secs => g * CAST(:step AS float8)) FROM generate_series(1, :n) g"
+        ), {"rids": rids, "r": restaurants, "n": orders, "pending": orders // 1000, "step": 365 * 24 * 3600 / orders})
+        await conn.execute(text("ANALYZE app.orders"))
+        print(f"{orders} orders over 12 months, {restaurants} restaurants, seeded in {time.perf_counter() - started:.0f}s")
+
+        rid = rids[0]
+        newest = (await conn.execute(text(
+            "SELECT id, table_number FROM app.orders WHERE restaurant_id = :rid ORDER BY created_at DESC LIMIT 1"
+        ), {"rid": rid})).first()
+        pending = list((await conn.execute(text(
+            "SELECT id FROM app.orders WHERE restaurant_id = :rid AND status = 'pending' LIMIT 20"
+        ), {"rid": rid})).scalars())
+        session = AsyncSession(bind=conn, join_transaction_mode="create_savepoint")
+        # Walk 100 pages in to get a cursor deep in the history
+        cursor = None
+        for _ in range(100):
+            _, _, cursor = await load_order_page(session, rid, 50, cursor)
+
+        calls = {
+            "load_order_page, page 1": lambda: load_order_page(session, rid, 50),
+            "load_order_page, page 101": lambda: load_order_page(session, rid, 50, cursor),
+            "load_order_status": lambda: load_order_status(session, newest.id, rid, newest.table_number),
+            f"transition_orders, {len(pending)} ids": lambda: transition_orders(
+                session, rid, "accepted", {order_id: None for order_id in pending}
+            ),
+        }
+        for name, call in calls.items():
+            partitions = await explain(conn, capture, call)
+            timings = await timed(conn, call)
+            print(
+                f"  {name:<28} median {statistics.median(timings):7.2f} ms  "
+                f"p95 {timings[int(len(timings) * 0.95)]:7.2f} ms  {partitions}"
+            )
+        await session.close()
+        await tx.rollback()
+    await manager.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(run(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 50_000_000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 1000,
+    ))
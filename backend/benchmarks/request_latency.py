@@ -0,0 +1,78 @@
+"""
+Per-request latency saved by checking the schema once at startup.
+
+Times sequential GET /order/menu-items/{id} and POST /auth/login requests
+against the in-process services twice:
+- "per request" replays what every handler used to do first, which was
+  db_manager.initialize() running Base.metadata.create_all and its
+  catalog queries
+- "at startup" is the services as they are, where the lifespan checks
+  the schema version once
+Login is dominated by bcrypt, so BCRYPT_ROUNDS defaults to 4 here to
+keep the schema check visible; pass a higher value in the environment
+to see it against real hashing. Needs a migrated database:
+
+    DATABASE_URL=postgresql+asyncpg://... python -m benchmarks.request_latency [requests]
+"""
+import asyncio
+import os
+import sys
+import time
+
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+from database.base import Base  # noqa: E402
+from database.db_manager import get_db_manager  # noqa: E402
+from benchmarks.common import Owner, service_clients, summarize  # noqa: E402
+
+
+def create_all_per_request(app):
+    """ASGI wrapper running the old per-request initialize() before each HTTP request."""
+    engine = get_db_manager().engine
+
+    async def wrapped(scope, receive, send):
+        if scope["type"] == "http":
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+        await app(scope, receive, send)
+
+    return wrapped
+
+
+async def measure(requests: int, wrap, owner: Owner | None):
+    async with service_clients(wrap) as (auth_client, customer_client):
+        created = owner is None
+        if created:
+            owner = await Owner.create(auth_client, customer_client)
+        url = f"/order/menu-items/{owner.restaurant_id}"
+        login = {"email": owner.email, "password": owner.password}
+        results = {}
+        for name, call in (
+            ("GET /order/menu-items/{id}", lambda: customer_client.get(url)),
+            ("POST /auth/login", lambda: auth_client.post("/auth/login", json=login)),
+        ):
+            await call()  # warm caches and the pool
+            timings = []
+            for _ in range(requests):
+                start = time.perf_counter()
+                response = await call()
+                timings.append((time.perf_counter() - start) * 1000)
+                response.raise_for_status()
+            results[name] = timings
+        return owner, results
+
+
+async def run(requests: int):
+    owner, after = await measure(requests, None, None)
+    _, before = await measure(requests, create_all_per_request, owner)
+    print(f"{requests} sequential requests each, BCRYPT_ROUNDS={os.environ['BCRYPT_ROUNDS']}")
+    for name in after:
+        print(f"  {name}")
+        print(f"    schema check per request  {summarize(before[name])}")
+        print(f"    schema check at startup   {summarize(after[name])}")
+    await owner.remove(get_db_manager().engine)
+    await get_db_manager().dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(run(int(sys.argv[1]) if len(sys.argv) > 1 else 200))
@@ -0,0 +1,48 @@
+"""
+Cost of verifying an access token per request, cold vs warm.
+
+Cold is a full signature check and claims decode (a token not seen
+before); warm is a TokenCache hit for a token already verified. Runs for
+every installed JWT backend; no database needed:
+
+    python -m benchmarks.token_verify [iterations]
+"""
+import sys
+import time
+from datetime import timedelta
+from microservices.common import auth
+
+
+def per_call_us(fn, iterations: int) -> float:
+    start = time.perf_counter()
+    for i in range(iterations):
+        fn(i)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def run(iterations: int):
+    claims = {"sub": "owner@example.com", "uid": 42, "rids": [1, 2, 3]}
+    for name, backend_class in auth.JWT_BACKENDS.items():
+        try:
+            backend = backend_class()
+        except ImportError as e:
+            print(f"{name:<6} skipped ({e})")
+            continue
+        auth.set_jwt_backend(backend)
+        # Distinct tokens, so every decode misses the cache
+        tokens = [
+            auth.create_access_token({**claims, "jti": str(i)}, timedelta(minutes=60))
+            for i in range(iterations)
+        ]
+        if auth.decode_access_token(tokens[0]) is None:
+            raise SystemExit(f"{name}: token did not verify")
+        auth.token_cache.clear()
+        cold = per_call_us(lambda i: auth.decode_access_token(tokens[i]), iterations)
+        # The cache is sized to the run, so every token is a hit now
+        warm = per_call_us(lambda i: auth.decode_access_token(tokens[i]), iterations)
+        print(f"{name:<6} cold {cold:8.1f} us/token   warm {warm:6.1f} us/token   ({cold / warm:.0f}x)")
+
+
+if __name__ == "__main__":
+    auth.token_cache.maxsize = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    run(auth.token_cache.maxsize)
@@ -1,6 +1,6 @@
 # database/__init__.py
 from .base import Base
-from .db_manager import AsyncDatabaseManager
+from .db_manager import AsyncDatabaseManager, get_db_manager
 from .model import MenuCategory, MenuItem, Restaurants, Orders, OrderItem
 
-__all__ = ["Base", "AsyncDatabaseManager", "MenuCategory", "MenuItem", "Restaurants", "Orders", "OrderItem"]
\ No newline at end of file
+__all__ = ["Base", "AsyncDatabaseManager", "get_db_manager", "MenuCategory", "MenuItem", "Restaurants", "Orders", "OrderItem"]
\ No newline at end of file
@@ -0,0 +1,136 @@
+# database/migrations/__init__.py
+"""
+Versioned schema migrations, run at deploy time:
+
+    python -m database.migrations upgrade
+
+Every module in versions/ has `revision`, `down_revision`, `description`,
+`transactional` and `upgrade(conn)` / `downgrade(conn)` functions that take
+a sync SQLAlchemy connection. Add new modules to MIGRATIONS in order.
+"""
+import os
+from sqlalchemy import Column, Integer, Table, func, inspect, select, text
+from ..base import Base
+from .versions import (
+    m0001_baseline,
+    m0002_query_indexes,
+    m0003_partition_orders,
+    m0004_order_version,
+    m0005_sales_hourly,
+)
+
+MIGRATIONS = [
+    m0001_baseline,
+    m0002_query_indexes,
+    m0003_partition_orders,
+    m0004_order_version,
+    m0005_sales_hourly,
+]
+HEAD = MIGRATIONS[-1].revision
+
+# Fail DDL fast instead of queueing live traffic behind an exclusive lock
+MIGRATION_LOCK_TIMEOUT = os.getenv("MIGRATION_LOCK_TIMEOUT", "5s")
+# Serializes concurrent deploys (arbitrary constant key)
+ADVISORY_LOCK_KEY = 727_001
+
+schema_version = Table(
+    "schema_version",
+    Base.metadata,
+    Column("version", Integer, nullable=False),
+)
+
+
+def current_version(sync_conn):
+    if not inspect(sync_conn).has_table("schema_version", schema=Base.metadata.schema):
+        return None
+    return sync_conn.execute(select(func.max(schema_version.c.version))).scalar()
+
+
+def _ensure_version_table(sync_conn):
+    sync_conn.execute(text("CREATE SCHEMA IF NOT EXISTS app"))
+    sync_conn.execute(text("CREATE TABLE IF NOT EXISTS app.schema_version (version INTEGER NOT NULL)"))
+
+
+def _set_version(sync_conn, version: int):
+    sync_conn.execute(schema_version.delete())
+    sync_conn.execute(schema_version.insert().values(version=version))
+
+
+async def _autocommit(engine):
+    conn = await engine.connect()
+    await conn.execution_options(isolation_level="AUTOCOMMIT")
+    return conn
+
+
+async def _release(conn, *settings):
+    """Return an autocommit connection to the app pool with its session settings reset."""
+    try:
+        for setting in settings:
+            await conn.execute(text(f"RESET {setting}"))
+    except Exception:
+        # Don't pool a connection in an unknown state
+        await conn.invalidate()
+    await conn.close()
+
+
+async def _apply(engine, migration, step, new_version: int):
+    if migration.transactional:
+        async with engine.begin() as conn:
+            await conn.execute(text(f"SET LOCAL lock_timeout = '{MIGRATION_LOCK_TIMEOUT}'"))
+            # The app pool's statement_timeout would cancel backfills and rewrites
+            await conn.execute(text("SET LOCAL statement_timeout = 0"))
+            await conn.run_sync(step)
+            await conn.run_sync(_set_version, new_version)
+    else:
+        conn = await _autocommit(engine)
+        try:
+            await conn.execute(text(f"SET lock_timeout = '{MIGRATION_LOCK_TIMEOUT}'"))
+            # CREATE INDEX CONCURRENTLY on a big table must not be cancelled
+            # halfway: that leaves an INVALID index behind
+            await conn.execute(text("SET statement_timeout = 0"))
+            await conn.run_sync(step)
+            await conn.run_sync(_set_version, new_version)
+        finally:
+            await _release(conn, "lock_timeout", "statement_timeout")
+
+
+async def _migrate(engine, target: int, down: bool) -> list:
+    # The lock connection stays in autocommit: an idle open transaction here
+    # would make CREATE INDEX CONCURRENTLY wait on it forever
+    lock_conn = await _autocommit(engine)
+    applied = []
+    try:
+        # A concurrent deploy waits its turn here instead of timing out
+        await lock_conn.execute(text("SET statement_timeout = 0"))
+        await lock_conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": ADVISORY_LOCK_KEY})
+        await lock_conn.run_sync(_ensure_version_table)
+        current = await lock_conn.run_sync(current_version) or 0
+        if down:
+            for migration in reversed(MIGRATIONS):
+                if target < migration.revision <= current:
+                    await _apply(engine, migration, migration.downgrade, migration.down_revision)
+                    applied.append(migration)
+        else:
+            for migration in MIGRATIONS:
+                if current < migration.revision <= target:
+                    await _apply(engine, migration, migration.upgrade, migration.revision)
+                    applied.append(migration)
+    finally:
+        await lock_conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": ADVISORY_LOCK_KEY})
+        await _release(lock_conn, "statement_timeout")
+    return applied
+
+
+async def upgrade(engine, target: int = HEAD) -> list:
+    """Apply pending migrations up to target; returns the migrations applied."""
+    return await _migrate(engine, target, down=False)
+
+
+async def downgrade(engine, target: int) -> list:
+    """Revert migrations above target, newest first."""
+    return await _migrate(engine, target, down=True)
+
+
+async def get_current_version(engine):
+    async with engine.connect() as conn:
+        return await conn.run_sync(current_version)
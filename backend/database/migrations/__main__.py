@@ -0,0 +1,58 @@
+# database/migrations/__main__.py
+import argparse
+import asyncio
+import sys
+from . import HEAD, MIGRATIONS, downgrade, get_current_version, upgrade
+from .plan_check import check_query_plans
+from ..partitions import run_maintenance
+
+
+async def _run(args) -> int:
+    from ..db_manager import AsyncDatabaseManager
+
+    # Not the app's engine: migrations and backfills must not hit the
+    # request statement_timeout
+    db_manager = AsyncDatabaseManager(statement_timeout_ms=0)
+    try:
+        if args.command == "upgrade":
+            for migration in await upgrade(db_manager.engine, args.revision):
+                print(f"upgraded to {migration.revision}: {migration.description}")
+        elif args.command == "downgrade":
+            for migration in await downgrade(db_manager.engine, args.revision):
+                print(f"reverted {migration.revision}: {migration.description}")
+        elif args.command == "current":
+            print(f"current: {await get_current_version(db_manager.engine)} (head: {HEAD})")
+        elif args.command == "history":
+            for migration in MIGRATIONS:
+                print(f"{migration.down_revision} -> {migration.revision}: {migration.description}")
+        elif args.command == "check-plans":
+            failures = await check_query_plans(db_manager.engine)
+            for name, problems in failures.items():
+                print(f"FAIL {name}: {'; '.join(problems)}")
+            if failures:
+                return 1
+            print("all hot queries use their indexes")
+        elif args.command == "partitions":
+            archived = await run_maintenance(db_manager.engine)
+            print(f"partitions up to date; archived: {', '.join(archived) or 'none'}")
+    finally:
+        await db_manager.dispose()
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m database.migrations")
+    commands = parser.add_subparsers(dest="command", required=True)
+    up = commands.add_parser("upgrade", help="apply pending migrations")
+    up.add_argument("revision", nargs="?", type=int, default=HEAD)
+    down = commands.add_parser("downgrade", help="revert migrations above a revision")
+    down.add_argument("revision", type=int)
+    commands.add_parser("current", help="show the database's revision")
+    commands.add_parser("history", help="list migrations")
+    commands.add_parser("check-plans", help="fail if a hot query scans a table or misses its index")
+    commands.add_parser("partitions", help="create upcoming order partitions, archive expired ones")
+    return asyncio.run(_run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,30 @@
+# database/migrations/ops.py
+"""
+Online-safe DDL helpers for migrations.
+
+CONCURRENTLY builds/drops take no lock that blocks reads or writes, but they
+cannot run inside a transaction: migrations using them set
+`transactional = False` and the runner gives them an autocommit connection.
+"""
+from sqlalchemy import text
+
+
+def create_index_concurrently(conn, name: str, table: str, columns: str, unique: bool = False):
+    # A failed CONCURRENTLY build leaves an INVALID index behind; drop it first
+    # so IF NOT EXISTS does not mistake it for a finished one
+    invalid = conn.execute(
+        text(
+            "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+            "JOIN pg_namespace n ON n.oid = c.relnamespace "
+            "WHERE n.nspname = 'app' AND c.relname = :name AND NOT i.indisvalid"
+        ),
+        {"name": name},
+    ).first()
+    if invalid:
+        drop_index_concurrently(conn, name)
+    kind = "UNIQUE INDEX" if unique else "INDEX"
+    conn.execute(text(f"CREATE {kind} CONCURRENTLY IF NOT EXISTS {name} ON app.{table} ({columns})"))
+
+
+def drop_index_concurrently(conn, name: str):
+    conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS app.{name}"))
@@ -0,0 +1,107 @@
+# database/migrations/plan_check.py
+"""
+EXPLAIN the hot queries and fail if any of them has to scan a whole table
+or does not use the index it was built for.
+
+Sequential scans are disabled for the check, so the planner picks an index
+whenever one can serve the query, whatever the table size; a Seq Scan left
+in the plan means the index is missing. Scans of partitions count as the
+partitioned index they belong to.
+
+    python -m database.migrations check-plans
+"""
+import json
+from sqlalchemy import bindparam, text
+
+# {name: (index the query is meant to use, query)}
+HOT_QUERIES = {
+    "menu listing": (
+        "ix_menu_items_restaurant_available",
+        "SELECT m.id, m.name, m.price, c.name FROM app.menu_items m "
+        "LEFT JOIN app.menu_categories c ON m.category_id = c.id "
+        "WHERE m.restaurant_id = 1 ORDER BY m.id",
+    ),
+    "available items": (
+        "ix_menu_items_restaurant_available",
+        "SELECT id FROM app.menu_items WHERE restaurant_id = 1 AND is_available",
+    ),
+    "kitchen queue": (
+        "ix_orders_restaurant_status_created",
+        "SELECT id FROM app.orders WHERE restaurant_id = 1 AND status = 'pending' "
+        "ORDER BY created_at",
+    ),
+    "order history page": (
+        "ix_orders_restaurant_created_id",
+        "SELECT id FROM app.orders WHERE restaurant_id = 1 "
+        "ORDER BY created_at DESC, id DESC LIMIT 50",
+    ),
+    "order lines": (
+        "ix_order_items_order_id",
+        "SELECT id FROM app.order_items WHERE order_id IN (1, 2, 3)",
+    ),
+    "owner restaurants": (
+        "ix_restaurants_user_id",
+        "SELECT id FROM app.restaurants WHERE user_id = 1",
+    ),
+    "sales dashboard": (
+        "sales_hourly_pkey",
+        "SELECT hour, sum(revenue) FROM app.sales_hourly WHERE restaurant_id = 1 "
+        "AND hour >= '2024-01-01' AND hour < '2024-02-01' GROUP BY hour",
+    ),
+}
+
+
+def _scans(plan: dict, seq_scans: list, indexes: set):
+    if plan.get("Node Type") == "Seq Scan":
+        seq_scans.append(plan.get("Relation Name", "?"))
+    if "Index Name" in plan:
+        indexes.add(plan["Index Name"])
+    for child in plan.get("Plans", []):
+        _scans(child, seq_scans, indexes)
+
+
+async def _root_indexes(conn, names: set) -> set:
+    """Partition index names mapped to the partitioned index they belong to."""
+    if not names:
+        return set()
+    result = await conn.execute(
+        text(
+            "SELECT DISTINCT root.relname FROM pg_class i "
+            "JOIN pg_class root ON root.oid = coalesce(pg_partition_root(i.oid), i.oid) "
+            "WHERE i.relname IN :names AND i.relnamespace = CAST('app' AS regnamespace)"
+        ).bindparams(bindparam("names", expanding=True)),
+        {"names": sorted(names)},
+    )
+    return set(result.scalars())
+
+
+async def plan_indexes(conn, sql: str) -> tuple[list[str], set[str]]:
+    """(tables scanned sequentially, indexes used) in the plan of one query."""
+    plan = (await conn.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"))).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    seq_scans, indexes = [], set()
+    _scans(plan[0]["Plan"], seq_scans, indexes)
+    return seq_scans, await _root_indexes(conn, indexes)
+
+
+async def check_plans(conn) -> dict:
+    """{query name: [problems]} for every offending query, on an open connection."""
+    failures = {}
+    await conn.execute(text("SET LOCAL enable_seqscan = off"))
+    for name, (index, sql) in HOT_QUERIES.items():
+        seq_scans, indexes = await plan_indexes(conn, sql)
+        problems = [f"sequential scan on {table}" for table in seq_scans]
+        if index not in indexes:
+            problems.append(f"does not use {index} (uses {', '.join(sorted(indexes)) or 'no index'})")
+        if problems:
+            failures[name] = problems
+    return failures
+
+
+async def check_query_plans(engine) -> dict:
+    """{query name: [problems]} for every offending query."""
+    async with engine.connect() as conn:
+        failures = await check_plans(conn)
+        await conn.rollback()
+    return failures
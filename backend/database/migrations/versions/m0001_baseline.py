@@ -0,0 +1,92 @@
+# database/migrations/versions/m0001_baseline.py
+"""
+Schema as it was before migrations existed (what create_all used to build).
+Frozen here as DDL so later model changes do not alter what revision 1 means;
+IF NOT EXISTS keeps it a no-op on databases created by create_all.
+"""
+from sqlalchemy import text
+
+revision = 1
+down_revision = 0
+description = "baseline schema"
+transactional = True
+
+TABLES = [
+    """CREATE TABLE IF NOT EXISTS app.menu_categories (
+        id SERIAL NOT NULL,
+        name VARCHAR(100) NOT NULL,
+        sort_order INTEGER,
+        created_at TIMESTAMP WITHOUT TIME ZONE DEFAULT now(),
+        PRIMARY KEY (id),
+        UNIQUE (name)
+    )""",
+    "CREATE INDEX IF NOT EXISTS ix_app_menu_categories_id ON app.menu_categories (id)",
+    """CREATE TABLE IF NOT EXISTS app.users (
+        id SERIAL NOT NULL,
+        name VARCHAR(100) NOT NULL,
+        email VARCHAR(120) NOT NULL,
+        password VARCHAR(255) NOT NULL,
+        created_at TIMESTAMP WITHOUT TIME ZONE DEFAULT now(),
+        PRIMARY KEY (id)
+    )""",
+    "CREATE INDEX IF NOT EXISTS ix_app_users_id ON app.users (id)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_app_users_email ON app.users (email)",
+    """CREATE TABLE IF NOT EXISTS app.restaurants (
+        id SERIAL NOT NULL,
+        name VARCHAR(100) NOT NULL,
+        address TEXT,
+        phone VARCHAR(15),
+        created_at TIMESTAMP WITHOUT TIME ZONE DEFAULT now(),
+        user_id INTEGER,
+        PRIMARY KEY (id),
+        FOREIGN KEY(user_id) REFERENCES app.users (id)
+    )""",
+    "CREATE INDEX IF NOT EXISTS ix_app_restaurants_id ON app.restaurants (id)",
+    """CREATE TABLE IF NOT EXISTS app.menu_items (
+        id SERIAL NOT NULL,
+        restaurant_id INTEGER,
+        category_id INTEGER,
+        name VARCHAR(100) NOT NULL,
+        description TEXT,
+        price DECIMAL(10, 2) NOT NULL,
+        created_at TIMESTAMP WITHOUT TIME ZONE DEFAULT now(),
+        image_url VARCHAR,
+        is_available BOOLEAN NOT NULL,
+        PRIMARY KEY (id),
+        FOREIGN KEY(restaurant_id) REFERENCES app.restaurants (id) ON DELETE CASCADE,
+        FOREIGN KEY(category_id) REFERENCES app.menu_categories (id) ON DELETE CASCADE
+    )""",
+    "CREATE INDEX IF NOT EXISTS ix_app_menu_items_id ON app.menu_items (id)",
+    """CREATE TABLE IF NOT EXISTS app.orders (
+        id SERIAL NOT NULL,
+        restaurant_id INTEGER,
+        table_number INTEGER,
+        total_amount DECIMAL(10, 2) NOT NULL,
+        status VARCHAR(20),
+        created_at TIMESTAMP WITHOUT TIME ZONE DEFAULT now(),
+        PRIMARY KEY (id),
+        FOREIGN KEY(restaurant_id) REFERENCES app.restaurants (id) ON DELETE CASCADE
+    )""",
+    "CREATE INDEX IF NOT EXISTS ix_app_orders_id ON app.orders (id)",
+    """CREATE TABLE IF NOT EXISTS app.order_items (
+        id SERIAL NOT NULL,
+        order_id INTEGER NOT NULL,
+        menu_item_id INTEGER NOT NULL,
+        quantity INTEGER NOT NULL,
+        price NUMERIC(10, 2) NOT NULL,
+        PRIMARY KEY (id),
+        FOREIGN KEY(order_id) REFERENCES app.orders (id) ON DELETE CASCADE,
+        FOREIGN KEY(menu_item_id) REFERENCES app.menu_items (id) ON DELETE CASCADE
+    )""",
+    "CREATE INDEX IF NOT EXISTS ix_app_order_items_id ON app.order_items (id)",
+]
+
+
+def upgrade(conn):
+    for statement in TABLES:
+        conn.execute(text(statement))
+
+
+def downgrade(conn):
+    for table in ("order_items", "orders", "menu_items", "restaurants", "users", "menu_categories"):
+        conn.execute(text(f"DROP TABLE IF EXISTS app.{table} CASCADE"))
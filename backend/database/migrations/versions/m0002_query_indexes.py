@@ -0,0 +1,38 @@
+# database/migrations/versions/m0002_query_indexes.py
+"""
+Indexes for the query shapes the routers actually run:
+
+- menu_items (restaurant_id, is_available): menu listing, price index, availability
+- menu_items (category_id): category join and cascading category deletes
+- orders (restaurant_id, status, created_at): kitchen queue by status, newest first
+- orders (restaurant_id, created_at, id): order history keyset pagination and reports
+- order_items (order_id): loading an order's lines and cascading order deletes
+- order_items (menu_item_id): per-item reports and cascading menu item deletes
+- restaurants (user_id): owner's restaurants at login
+"""
+from ..ops import create_index_concurrently, drop_index_concurrently
+
+revision = 2
+down_revision = 1
+description = "indexes for menu, order and order item query shapes"
+transactional = False
+
+INDEXES = [
+    ("ix_menu_items_restaurant_available", "menu_items", "restaurant_id, is_available"),
+    ("ix_menu_items_category_id", "menu_items", "category_id"),
+    ("ix_orders_restaurant_status_created", "orders", "restaurant_id, status, created_at"),
+    ("ix_orders_restaurant_created_id", "orders", "restaurant_id, created_at, id"),
+    ("ix_order_items_order_id", "order_items", "order_id"),
+    ("ix_order_items_menu_item_id", "order_items", "menu_item_id"),
+    ("ix_restaurants_user_id", "restaurants", "user_id"),
+]
+
+
+def upgrade(conn):
+    for name, table, columns in INDEXES:
+        create_index_concurrently(conn, name, table, columns)
+
+
+def downgrade(conn):
+    for name, _, _ in INDEXES:
+        drop_index_concurrently(conn, name)
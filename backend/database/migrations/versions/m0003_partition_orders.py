@@ -0,0 +1,133 @@
+# database/migrations/versions/m0003_partition_orders.py
+"""
+Rebuild app.orders and app.order_items as monthly RANGE-partitioned tables.
+
+Postgres requires the partition key in every unique constraint, so the
+primary keys become (id, created_at) and order_items gains order_created_at
+to carry its order's partition key (and its own). The rewrite holds
+exclusive locks on both tables while rows are copied: run it in a
+maintenance window.
+"""
+import datetime
+from sqlalchemy import text
+from ...partitions import PARTITION_MONTHS_AHEAD, add_months, ensure_partitions
+
+revision = 3
+down_revision = 2
+description = "monthly range partitions for orders and order_items"
+transactional = True
+
+INDEXES = [
+    "CREATE INDEX ix_app_orders_id ON app.orders (id)",
+    "CREATE INDEX ix_orders_restaurant_status_created ON app.orders (restaurant_id, status, created_at)",
+    "CREATE INDEX ix_orders_restaurant_created_id ON app.orders (restaurant_id, created_at, id)",
+    "CREATE INDEX ix_app_order_items_id ON app.order_items (id)",
+    "CREATE INDEX ix_order_items_order_id ON app.order_items (order_id)",
+    "CREATE INDEX ix_order_items_menu_item_id ON app.order_items (menu_item_id)",
+]
+
+
+def upgrade(conn):
+    conn.execute(text("""
+        CREATE TABLE app.orders_new (
+            id INTEGER NOT NULL DEFAULT nextval('app.orders_id_seq'),
+            restaurant_id INTEGER CONSTRAINT orders_restaurant_id_fkey
+                REFERENCES app.restaurants (id) ON DELETE CASCADE,
+            table_number INTEGER,
+            total_amount DECIMAL(10, 2) NOT NULL,
+            status VARCHAR(20),
+            created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT now(),
+            CONSTRAINT orders_part_pkey PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+    """))
+    conn.execute(text("""
+        CREATE TABLE app.order_items_new (
+            id INTEGER NOT NULL DEFAULT nextval('app.order_items_id_seq'),
+            order_id INTEGER NOT NULL,
+            order_created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            menu_item_id INTEGER NOT NULL CONSTRAINT order_items_menu_item_id_fkey
+                REFERENCES app.menu_items (id) ON DELETE CASCADE,
+            quantity INTEGER NOT NULL,
+            price NUMERIC(10, 2) NOT NULL,
+            CONSTRAINT order_items_part_pkey PRIMARY KEY (id, order_created_at),
+            CONSTRAINT order_items_order_fkey FOREIGN KEY (order_id, order_created_at)
+                REFERENCES app.orders_new (id, created_at) ON DELETE CASCADE
+        ) PARTITION BY RANGE (order_created_at)
+    """))
+
+    # One partition per month from the oldest order through the months ahead
+    oldest = conn.execute(text("SELECT min(created_at) FROM app.orders")).scalar()
+    today = datetime.date.today()
+    ensure_partitions(
+        conn,
+        oldest.date() if oldest else today,
+        add_months(today, PARTITION_MONTHS_AHEAD),
+        parents={"order_items": "order_items_new", "orders": "orders_new"},
+    )
+
+    conn.execute(text("""
+        INSERT INTO app.orders_new (id, restaurant_id, table_number, total_amount, status, created_at)
+        SELECT id, restaurant_id, table_number, total_amount, status, COALESCE(created_at, now())
+        FROM app.orders
+    """))
+    conn.execute(text("""
+        INSERT INTO app.order_items_new (id, order_id, order_created_at, menu_item_id, quantity, price)
+        SELECT oi.id, oi.order_id, o.created_at, oi.menu_item_id, oi.quantity, oi.price
+        FROM app.order_items oi JOIN app.orders_new o ON o.id = oi.order_id
+    """))
+
+    # Keep the id sequences alive when the old tables go
+    conn.execute(text("ALTER SEQUENCE app.orders_id_seq OWNED BY app.orders_new.id"))
+    conn.execute(text("ALTER SEQUENCE app.order_items_id_seq OWNED BY app.order_items_new.id"))
+    conn.execute(text("DROP TABLE app.order_items"))
+    conn.execute(text("DROP TABLE app.orders"))
+    conn.execute(text("ALTER TABLE app.orders_new RENAME TO orders"))
+    conn.execute(text("ALTER TABLE app.order_items_new RENAME TO order_items"))
+    conn.execute(text("ALTER TABLE app.orders RENAME CONSTRAINT orders_part_pkey TO orders_pkey"))
+    conn.execute(text("ALTER TABLE app.order_items RENAME CONSTRAINT order_items_part_pkey TO order_items_pkey"))
+    # Indexes on a partitioned parent cascade to every partition
+    for statement in INDEXES:
+        conn.execute(text(statement))
+
+
+def downgrade(conn):
+    conn.execute(text("""
+        CREATE TABLE app.orders_old (
+            id INTEGER NOT NULL DEFAULT nextval('app.orders_id_seq') PRIMARY KEY,
+            restaurant_id INTEGER CONSTRAINT orders_restaurant_id_fkey
+                REFERENCES app.restaurants (id) ON DELETE CASCADE,
+            table_number INTEGER,
+            total_amount DECIMAL(10, 2) NOT NULL,
+            status VARCHAR(20),
+            created_at TIMESTAMP WITHOUT TIME ZONE DEFAULT now()
+        )
+    """))
+    conn.execute(text("""
+        CREATE TABLE app.order_items_old (
+            id INTEGER NOT NULL DEFAULT nextval('app.order_items_id_seq') PRIMARY KEY,
+            order_id INTEGER NOT NULL CONSTRAINT order_items_order_id_fkey
+                REFERENCES app.orders_old (id) ON DELETE CASCADE,
+            menu_item_id INTEGER NOT NULL CONSTRAINT order_items_menu_item_id_fkey
+                REFERENCES app.menu_items (id) ON DELETE CASCADE,
+            quantity INTEGER NOT NULL,
+            price NUMERIC(10, 2) NOT NULL
+        )
+    """))
+    conn.execute(text("""
+        INSERT INTO app.orders_old (id, restaurant_id, table_number, total_amount, status, created_at)
+        SELECT id, restaurant_id, table_number, total_amount, status, created_at FROM app.orders
+    """))
+    conn.execute(text("""
+        INSERT INTO app.order_items_old (id, order_id, menu_item_id, quantity, price)
+        SELECT id, order_id, menu_item_id, quantity, price FROM app.order_items
+    """))
+    conn.execute(text("ALTER SEQUENCE app.orders_id_seq OWNED BY app.orders_old.id"))
+    conn.execute(text("ALTER SEQUENCE app.order_items_id_seq OWNED BY app.order_items_old.id"))
+    conn.execute(text("DROP TABLE app.order_items"))
+    conn.execute(text("DROP TABLE app.orders"))
+    conn.execute(text("ALTER TABLE app.orders_old RENAME TO orders"))
+    conn.execute(text("ALTER TABLE app.order_items_old RENAME TO order_items"))
+    conn.execute(text("ALTER TABLE app.orders RENAME CONSTRAINT orders_old_pkey TO orders_pkey"))
+    conn.execute(text("ALTER TABLE app.order_items RENAME CONSTRAINT order_items_old_pkey TO order_items_pkey"))
+    for statement in INDEXES:
+        conn.execute(text(statement))
@@ -0,0 +1,27 @@
+# database/migrations/versions/m0004_order_version.py
+"""
+Order lifecycle support:
+
+- orders.version: bumped on every status change, for optimistic concurrency
+- orders.status: backfill NULLs and default to 'pending' in the database too
+
+Adding a NOT NULL column with a constant default is a catalog-only change
+on Postgres 11+, so this does not rewrite the partitions.
+"""
+from sqlalchemy import text
+
+revision = 4
+down_revision = 3
+description = "order version column and status default"
+transactional = True
+
+
+def upgrade(conn):
+    conn.execute(text("ALTER TABLE app.orders ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 1"))
+    conn.execute(text("UPDATE app.orders SET status = 'pending' WHERE status IS NULL"))
+    conn.execute(text("ALTER TABLE app.orders ALTER COLUMN status SET DEFAULT 'pending'"))
+
+
+def downgrade(conn):
+    conn.execute(text("ALTER TABLE app.orders ALTER COLUMN status DROP DEFAULT"))
+    conn.execute(text("ALTER TABLE app.orders DROP COLUMN IF EXISTS version"))
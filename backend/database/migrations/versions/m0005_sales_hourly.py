@@ -0,0 +1,40 @@
+# database/migrations/versions/m0005_sales_hourly.py
+"""
+app.sales_hourly: revenue and quantity per restaurant, hour and menu item,
+for dashboards. Backfilled from every order that is not cancelled; from
+then on the order write path keeps it current.
+"""
+from sqlalchemy import text
+
+revision = 5
+down_revision = 4
+description = "hourly sales rollup"
+transactional = True
+
+
+def upgrade(conn):
+    conn.execute(text("""
+        CREATE TABLE app.sales_hourly (
+            restaurant_id INTEGER NOT NULL CONSTRAINT sales_hourly_restaurant_id_fkey
+                REFERENCES app.restaurants (id) ON DELETE CASCADE,
+            hour TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            menu_item_id INTEGER NOT NULL CONSTRAINT sales_hourly_menu_item_id_fkey
+                REFERENCES app.menu_items (id) ON DELETE CASCADE,
+            quantity INTEGER NOT NULL DEFAULT 0,
+            revenue NUMERIC(12, 2) NOT NULL DEFAULT 0,
+            CONSTRAINT sales_hourly_pkey PRIMARY KEY (restaurant_id, hour, menu_item_id)
+        )
+    """))
+    conn.execute(text("""
+        INSERT INTO app.sales_hourly (restaurant_id, hour, menu_item_id, quantity, revenue)
+        SELECT o.restaurant_id, date_trunc('hour', o.created_at), oi.menu_item_id,
+               sum(oi.quantity), sum(oi.quantity * oi.price)
+        FROM app.orders o
+        JOIN app.order_items oi ON oi.order_id = o.id AND oi.order_created_at = o.created_at
+        WHERE o.status IS DISTINCT FROM 'cancelled' AND o.restaurant_id IS NOT NULL
+        GROUP BY 1, 2, 3
+    """))
+
+
+def downgrade(conn):
+    conn.execute(text("DROP TABLE IF EXISTS app.sales_hourly"))
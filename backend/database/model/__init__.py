@@ -4,7 +4,8 @@ from .menu_items import MenuItem
 from .orders import Orders
 from .order_items import OrderItem
 from .user import User
+from .sales_hourly import SalesHourly
 
 
 # Export all models
-__all__ = ["Restaurants", "MenuCategory", "MenuItem", "Orders", "OrderItem","User"]
\ No newline at end of file
+__all__ = ["Restaurants", "MenuCategory", "MenuItem", "Orders", "OrderItem","User","SalesHourly"]
\ No newline at end of file
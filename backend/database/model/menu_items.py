@@ -1,9 +1,13 @@
-from sqlalchemy import Column, Integer, String, Text, DECIMAL, ForeignKey, TIMESTAMP, func, Boolean
+from sqlalchemy import Column, Integer, String, Text, DECIMAL, ForeignKey, TIMESTAMP, func, Boolean, Index
 from sqlalchemy.orm import relationship
 from database.base import Base
 
 class MenuItem(Base):
     __tablename__ = "menu_items"
+    __table_args__ = (
+        Index("ix_menu_items_restaurant_available", "restaurant_id", "is_available"),
+        Index("ix_menu_items_category_id", "category_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     restaurant_id = Column(Integer, ForeignKey("restaurants.id", ondelete="CASCADE"))
@@ -1,15 +1,27 @@
-from sqlalchemy import Column, Integer, Numeric, String, Text, DECIMAL, ForeignKey, TIMESTAMP, func
+from sqlalchemy import Column, Integer, Numeric, String, Text, DECIMAL, ForeignKey, ForeignKeyConstraint, TIMESTAMP, func, Index
 from sqlalchemy.orm import relationship
 from database.base import Base
 
 class OrderItem(Base):
     __tablename__ = "order_items"
-    __table_args__ = {"schema": "app"}
+    __table_args__ = (
+        ForeignKeyConstraint(
+            ["order_id", "order_created_at"],
+            ["app.orders.id", "app.orders.created_at"],
+            ondelete="CASCADE",
+            name="order_items_order_fkey",
+        ),
+        Index("ix_order_items_order_id", "order_id"),
+        Index("ix_order_items_menu_item_id", "menu_item_id"),
+        # Partitioned like orders, on the parent order's created_at
+        {"schema": "app", "postgresql_partition_by": "RANGE (order_created_at)"},
+    )
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
 
-    # Foreign keys
-    order_id = Column(Integer, ForeignKey("app.orders.id", ondelete="CASCADE"), nullable=False)
+    # Foreign keys (order_created_at completes the key into partitioned orders)
+    order_id = Column(Integer, nullable=False)
+    order_created_at = Column(TIMESTAMP, primary_key=True, nullable=False)
     menu_item_id = Column(Integer, ForeignKey("menu_items.id", ondelete="CASCADE"), nullable=False)
 
     # Details
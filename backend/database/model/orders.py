@@ -1,18 +1,27 @@
 # database/model/orders.py
-from sqlalchemy import Column, Integer, ForeignKey, String, DECIMAL, TIMESTAMP, func
+from sqlalchemy import Column, Integer, ForeignKey, String, DECIMAL, TIMESTAMP, func, Index
 from sqlalchemy.orm import relationship
 from database.base import Base
 
 class Orders(Base):
     __tablename__ = "orders"
-    __table_args__ = {"schema": "app"}
+    __table_args__ = (
+        Index("ix_orders_restaurant_status_created", "restaurant_id", "status", "created_at"),
+        Index("ix_orders_restaurant_created_id", "restaurant_id", "created_at", "id"),
+        # Monthly partitions, see database/partitions.py
+        {"schema": "app", "postgresql_partition_by": "RANGE (created_at)"},
+    )
 
+    # Partition key must be part of the primary key
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     restaurant_id = Column(Integer, ForeignKey("restaurants.id", ondelete="CASCADE"))
     table_number = Column(Integer, nullable=True)
     total_amount = Column(DECIMAL(10, 2), nullable=False)
-    status = Column(String(20), default="pending")
-    created_at = Column(TIMESTAMP, server_default=func.now())
+    # Lifecycle: see microservices/customer_services/order_status.py
+    status = Column(String(20), default="pending", server_default="pending")
+    # Bumped on every status change (optimistic concurrency)
+    version = Column(Integer, nullable=False, server_default="1")
+    created_at = Column(TIMESTAMP, primary_key=True, nullable=False, server_default=func.now())
 
     # Relationships
     restaurant = relationship("Restaurants", back_populates="orders")
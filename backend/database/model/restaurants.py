@@ -1,16 +1,17 @@
-from sqlalchemy import Column, ForeignKey, Integer, String, Text, TIMESTAMP, func
+from sqlalchemy import Column, ForeignKey, Index, Integer, String, Text, TIMESTAMP, func
 from sqlalchemy.orm import relationship
 from database.base import Base
 
 class Restaurants(Base):
     __tablename__ = "restaurants"
+    __table_args__ = (Index("ix_restaurants_user_id", "user_id"),)
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     name = Column(String(100), nullable=False)
     address = Column(Text, nullable=True)
     phone = Column(String(15), nullable=True)
     created_at = Column(TIMESTAMP, server_default=func.now())
-    user_id = Column(Integer, ForeignKey("users.id")) 
+    user_id = Column(Integer, ForeignKey("users.id"))
 
     # Relationships
     # categories = relationship("MenuCategory", back_populates="restaurant")
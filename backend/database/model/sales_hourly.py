@@ -0,0 +1,17 @@
+# database/model/sales_hourly.py
+from sqlalchemy import Column, ForeignKey, Integer, Numeric, TIMESTAMP
+from database.base import Base
+
+class SalesHourly(Base):
+    """
+    Sales per restaurant, hour and menu item, kept up to date as orders are
+    placed and cancelled (see customer_services/sales_rollup.py).
+    """
+    __tablename__ = "sales_hourly"
+
+    # Primary key order serves "one restaurant, a time range" directly
+    restaurant_id = Column(Integer, ForeignKey("restaurants.id", ondelete="CASCADE"), primary_key=True)
+    hour = Column(TIMESTAMP, primary_key=True)
+    menu_item_id = Column(Integer, ForeignKey("menu_items.id", ondelete="CASCADE"), primary_key=True)
+    quantity = Column(Integer, nullable=False, server_default="0")
+    revenue = Column(Numeric(12, 2), nullable=False, server_default="0")
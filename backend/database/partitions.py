@@ -0,0 +1,127 @@
+# database/partitions.py
+"""
+Monthly range partitions for app.orders (created_at) and app.order_items
+(order_created_at).
+
+Partitions are named <table>_pYYYYMM. maintain() creates the current month
+plus PARTITION_MONTHS_AHEAD future months, and when PARTITION_RETENTION_MONTHS
+is set it detaches older months and moves them to the archive schema, where
+they stay queryable but out of every hot query's plan.
+"""
+import asyncio
+import datetime
+import os
+import re
+from sqlalchemy import text
+
+PARTITION_MONTHS_AHEAD = int(os.getenv("PARTITION_MONTHS_AHEAD", "3"))
+# 0 keeps every month attached
+PARTITION_RETENTION_MONTHS = int(os.getenv("PARTITION_RETENTION_MONTHS", "0"))
+PARTITION_ARCHIVE_SCHEMA = os.getenv("PARTITION_ARCHIVE_SCHEMA", "archive")
+PARTITION_MAINTENANCE_INTERVAL = int(os.getenv("PARTITION_MAINTENANCE_INTERVAL", str(6 * 3600)))
+
+# Referencing table first: its partitions must be detached before the
+# orders partitions they point at
+PARTITIONED_TABLES = ("order_items", "orders")
+ADVISORY_LOCK_KEY = 727_002
+
+_PARTITION_NAME = re.compile(r"_p(\d{4})(\d{2})$")
+
+
+def month_start(day: datetime.date) -> datetime.date:
+    return datetime.date(day.year, day.month, 1)
+
+
+def add_months(day: datetime.date, months: int) -> datetime.date:
+    index = day.year * 12 + day.month - 1 + months
+    return datetime.date(index // 12, index % 12 + 1, 1)
+
+
+def create_partition(sync_conn, parent: str, month: datetime.date, table: str | None = None):
+    """Create the partition of app.<parent> for the month starting at `month`."""
+    table = table or parent
+    month = month_start(month)
+    name = f"{table}_p{month:%Y%m}"
+    sync_conn.execute(text(
+        f"CREATE TABLE IF NOT EXISTS app.{name} PARTITION OF app.{parent} "
+        f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+    ))
+
+
+def ensure_partitions(sync_conn, start: datetime.date, end: datetime.date, parents=None):
+    """Create monthly partitions covering [start, end] for every partitioned table."""
+    parents = parents or {table: table for table in PARTITIONED_TABLES}
+    month = month_start(start)
+    while month <= end:
+        for table, parent in parents.items():
+            create_partition(sync_conn, parent, month, table)
+        month = add_months(month, 1)
+
+
+def attached_partitions(sync_conn, parent: str) -> list[tuple[str, datetime.date]]:
+    rows = sync_conn.execute(text(
+        "SELECT c.relname FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid "
+        "JOIN pg_class p ON p.oid = i.inhparent "
+        "JOIN pg_namespace n ON n.oid = p.relnamespace "
+        "WHERE n.nspname = 'app' AND p.relname = :parent"
+    ), {"parent": parent}).scalars()
+    partitions = []
+    for name in rows:
+        match = _PARTITION_NAME.search(name)
+        if match:
+            partitions.append((name, datetime.date(int(match[1]), int(match[2]), 1)))
+    return sorted(partitions, key=lambda p: p[1])
+
+
+def archive_partitions(sync_conn, before: datetime.date) -> list[str]:
+    """Detach partitions for months before `before` and move them to the archive schema."""
+    sync_conn.execute(text(f"CREATE SCHEMA IF NOT EXISTS {PARTITION_ARCHIVE_SCHEMA}"))
+    archived = []
+    for parent in PARTITIONED_TABLES:
+        for name, month in attached_partitions(sync_conn, parent):
+            if month >= before:
+                continue
+            sync_conn.execute(text(f"ALTER TABLE app.{parent} DETACH PARTITION app.{name}"))
+            # A detached order_items partition keeps its own copy of the FK to
+            # app.orders, which would block detaching that month's orders
+            for constraint in _foreign_keys_to(sync_conn, name, "orders"):
+                sync_conn.execute(text(f'ALTER TABLE app.{name} DROP CONSTRAINT "{constraint}"'))
+            sync_conn.execute(text(f"ALTER TABLE app.{name} SET SCHEMA {PARTITION_ARCHIVE_SCHEMA}"))
+            archived.append(name)
+    return archived
+
+
+def _foreign_keys_to(sync_conn, table: str, referenced: str) -> list[str]:
+    return list(sync_conn.execute(text(
+        "SELECT conname FROM pg_constraint "
+        "WHERE contype = 'f' AND conrelid = CAST(:table AS regclass) "
+        "AND confrelid = CAST(:referenced AS regclass)"
+    ), {"table": f"app.{table}", "referenced": f"app.{referenced}"}).scalars())
+
+
+def maintain(sync_conn, today: datetime.date | None = None) -> list[str]:
+    """Create upcoming partitions and archive expired ones; safe to run from every worker."""
+    today = today or datetime.date.today()
+    sync_conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": ADVISORY_LOCK_KEY})
+    ensure_partitions(sync_conn, today, add_months(month_start(today), PARTITION_MONTHS_AHEAD))
+    if PARTITION_RETENTION_MONTHS > 0:
+        return archive_partitions(sync_conn, add_months(month_start(today), -PARTITION_RETENTION_MONTHS))
+    return []
+
+
+async def run_maintenance(engine) -> list[str]:
+    async with engine.begin() as conn:
+        return await conn.run_sync(maintain)
+
+
+async def maintenance_loop(engine, interval: int = PARTITION_MAINTENANCE_INTERVAL):
+    """Background task for the app lifespan: keep partitions ahead of the calendar."""
+    while True:
+        try:
+            archived = await run_maintenance(engine)
+            if archived:
+                print(f"archived partitions: {', '.join(archived)}")
+        except Exception as e:
+            print(f"partition maintenance failed: {e}")
+        await asyncio.sleep(interval)
@@ -0,0 +1,97 @@
+# database/pool.py
+import os
+import time
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+# Pool settings - override per service through the environment
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "5000"))
+# Hard ceiling on connections this service may hold (pool_size + max_overflow)
+DB_POOL_SERVICE_CAP = int(os.getenv("DB_POOL_SERVICE_CAP", "0"))
+
+
+class PoolMetrics:
+    """Counters collected by MeteredQueuePool on every checkout."""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.overflow_events = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def record_checkout(self, waited: float, overflowed: bool):
+        self.checkouts += 1
+        self.wait_total += waited
+        self.wait_max = max(self.wait_max, waited)
+        if overflowed:
+            self.overflow_events += 1
+
+
+class MeteredQueuePool(AsyncAdaptedQueuePool):
+    """Async queue pool that records checkout wait time and overflow events."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def _do_get(self):
+        overflow_before = self.overflow()
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.timeouts += 1
+            raise
+        overflowed = self.overflow() > max(overflow_before, 0)
+        self.metrics.record_checkout(time.perf_counter() - start, overflowed)
+        return conn
+
+    def snapshot(self) -> dict:
+        m = self.metrics
+        return {
+            "pool_size": self.size(),
+            "checked_out": self.checkedout(),
+            "checked_in": self.checkedin(),
+            "overflow": max(self.overflow(), 0),
+            "checkouts": m.checkouts,
+            "overflow_events": m.overflow_events,
+            "timeouts": m.timeouts,
+            "wait_avg_ms": round(m.wait_total / m.checkouts * 1000, 3) if m.checkouts else 0.0,
+            "wait_max_ms": round(m.wait_max * 1000, 3),
+        }
+
+
+def pool_options(database_url: str, statement_timeout_ms: int = DB_STATEMENT_TIMEOUT_MS) -> dict:
+    """Build create_async_engine kwargs from the pool settings above (0 = no statement timeout); sessions run in UTC."""
+    pool_size = DB_POOL_SIZE
+    max_overflow = DB_MAX_OVERFLOW
+    if DB_POOL_SERVICE_CAP > 0:
+        pool_size = min(pool_size, DB_POOL_SERVICE_CAP)
+        max_overflow = max(min(max_overflow, DB_POOL_SERVICE_CAP - pool_size), 0)
+
+    options = {
+        "poolclass": MeteredQueuePool,
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+    # created_at columns are TIMESTAMP DEFAULT now(), which Postgres renders in
+    # the session time zone; pin it so order times and rollup hours are UTC
+    # whatever the server or role default is
+    settings = {"timezone": "UTC"}
+    if statement_timeout_ms > 0:
+        settings["statement_timeout"] = str(statement_timeout_ms)
+    if "+asyncpg" in database_url:
+        options["connect_args"] = {"server_settings": settings}
+    else:
+        options["connect_args"] = {"options": " ".join(f"-c {name}={value}" for name, value in settings.items())}
+    return options
@@ -0,0 +1,123 @@
+# database/query_log.py
+import hashlib
+import json
+import logging
+import os
+import queue
+import random
+import re
+import threading
+import time
+from functools import lru_cache
+from sqlalchemy import event
+
+# Query logging is off unless DB_QUERY_LOG is set
+DB_QUERY_LOG = os.getenv("DB_QUERY_LOG", "false").lower() in ("1", "true", "yes")
+DB_QUERY_LOG_SAMPLE_RATE = float(os.getenv("DB_QUERY_LOG_SAMPLE_RATE", "0.01"))
+DB_SLOW_QUERY_MS = float(os.getenv("DB_SLOW_QUERY_MS", "200"))
+DB_QUERY_LOG_QUEUE_SIZE = int(os.getenv("DB_QUERY_LOG_QUEUE_SIZE", "10000"))
+# INFO shows sampled queries, WARNING only slow ones
+DB_QUERY_LOG_LEVEL = os.getenv("DB_QUERY_LOG_LEVEL", "INFO").upper()
+
+logger = logging.getLogger("database.query")
+
+
+def configure_logger(level: str = DB_QUERY_LOG_LEVEL):
+    """
+    Give database.query its own stderr handler unless the app already
+    configured one; nothing else in the services sets up logging, so the
+    root logger's WARNING default would otherwise swallow sampled entries.
+    """
+    logger.setLevel(level)
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s %(message)s"))
+        logger.addHandler(handler)
+        logger.propagate = False
+
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b|\$\d+|%\(\w+\)s|:\w+|\?")
+_IN_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=1024)
+def fingerprint(statement: str) -> tuple[str, str]:
+    """Normalize a statement (literals/params -> ?) and return (digest, normalized)."""
+    normalized = _WHITESPACE.sub(" ", statement).strip()
+    normalized = _LITERALS.sub("?", normalized)
+    normalized = _IN_LISTS.sub("(?)", normalized)
+    digest = hashlib.sha1(normalized.encode()).hexdigest()[:16]
+    return digest, normalized
+
+
+class QueryLogWriter:
+    """
+    Background thread that formats and emits query log entries.
+    The event-loop side only does a non-blocking put; if the queue is full
+    the entry is dropped and counted instead of waiting.
+    """
+
+    def __init__(self, maxsize: int = DB_QUERY_LOG_QUEUE_SIZE):
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.dropped = 0
+        self._thread = threading.Thread(target=self._run, name="query-log", daemon=True)
+        self._thread.start()
+
+    def submit(self, statement: str, duration: float, rowcount: int, slow: bool):
+        try:
+            self.queue.put_nowait((statement, duration, rowcount, slow))
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self):
+        while True:
+            statement, duration, rowcount, slow = self.queue.get()
+            digest, normalized = fingerprint(statement)
+            entry = {
+                "fingerprint": digest,
+                "statement": normalized[:500],
+                "duration_ms": round(duration * 1000, 3),
+                "rows": rowcount,
+                "slow": slow,
+            }
+            logger.log(logging.WARNING if slow else logging.INFO, json.dumps(entry))
+
+
+_writer: QueryLogWriter | None = None
+
+
+def install_query_logging(
+    engine,
+    sample_rate: float = DB_QUERY_LOG_SAMPLE_RATE,
+    slow_query_ms: float = DB_SLOW_QUERY_MS,
+):
+    """
+    Attach timing hooks to an engine. Slow queries are always logged;
+    everything else is sampled at sample_rate.
+    """
+    global _writer
+    if _writer is None:
+        configure_logger()
+        _writer = QueryLogWriter()
+    writer = _writer
+    slow_threshold = slow_query_ms / 1000
+    sync_engine = getattr(engine, "sync_engine", engine)
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        duration = time.perf_counter() - conn.info["query_start"].pop()
+        slow = duration >= slow_threshold
+        if slow or random.random() < sample_rate:
+            writer.submit(statement, duration, cursor.rowcount, slow)
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _error(context):
+        # after_cursor_execute never runs for a failed statement
+        conn = context.connection
+        if conn is not None and conn.info.get("query_start"):
+            conn.info["query_start"].pop()
@@ -1,8 +1,19 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from .router import create_base_router
+from microservices.common.responses import FastJSONResponse
+from .router import create_base_router, db_manager
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Schema check runs once here instead of on every request
+    await db_manager.initialize()
+    yield
+    await db_manager.dispose()
+
+
+app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
 
 # Allow React frontend to communicate
 origins = [
@@ -2,14 +2,35 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from .schema import UserCreate, UserLogin, UserOut
-from .utils import hash_password, verify_password, create_access_token, decode_access_token
+from .utils import (
+    PasswordHasherBusy,
+    create_access_token,
+    decode_access_token,
+    hash_password_async,
+    verify_password_async,
+)
 from fastapi.security import OAuth2PasswordBearer
-from database.db_manager import AsyncDatabaseManager
-from database.model import User
+from microservices.common.responses import FastJSONResponse
+from microservices.common.internal import require_internal_token
+from database.db_manager import get_db_manager
+from database.model import Restaurants, User
+from microservices.common.users import CurrentUser, UserCache, load_user, restaurant_ids_column, user_claims
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
-db_manager = AsyncDatabaseManager()
+db_manager = get_db_manager()
+user_cache = UserCache()
+
+async def run_hasher(coro):
+    """Await a hash/verify call, turning a full hash queue into a 503."""
+    try:
+        return await coro
+    except PasswordHasherBusy:
+        raise HTTPException(
+            status_code=503,
+            detail="Too many sign-ins in progress, please retry",
+            headers={"Retry-After": "1"},
+        )
 
 def create_base_router() -> APIRouter:
     router = APIRouter()
@@ -17,7 +38,8 @@ def create_base_router() -> APIRouter:
 # Signup
     @router.post("/register", response_model=UserOut)
     async def signup(user: UserCreate):
-        await db_manager.initialize()
+        # Hash before taking a pooled connection; bcrypt takes tens of ms
+        hashed_password = await run_hasher(hash_password_async(user.password))
         async_session = await db_manager.get_session()
 
         async with async_session() as session:
@@ -29,7 +51,7 @@ def create_base_router() -> APIRouter:
             new_user = User(
                 name=user.name,
                 email=user.email,
-                password=hash_password(user.password),
+                password=hashed_password,
             )
             session.add(new_user)
             await session.commit()
@@ -39,18 +61,25 @@ def create_base_router() -> APIRouter:
     # Login
     @router.post("/login")
     async def login(user: UserLogin):
-        await db_manager.initialize()
         async_session = await db_manager.get_session()
 
         async with async_session() as session:
-            result = await session.execute(select(User).where(User.email == user.email))
-            db_user = result.scalar_one_or_none()
+            # Restaurant ids come back with the user so they can go in the token
+            result = await session.execute(
+                select(User.id, User.email, User.name, User.password, restaurant_ids_column())
+                .outerjoin(Restaurants, Restaurants.user_id == User.id)
+                .where(User.email == user.email)
+                .group_by(User.id)
+            )
+            db_user = result.one_or_none()
 
-            if not db_user or not verify_password(user.password, db_user.password):
-                raise HTTPException(status_code=401, detail="Invalid credentials")
+        # Verify after the session is closed so the connection is not held
+        if not db_user or not await run_hasher(verify_password_async(user.password, db_user.password)):
+            raise HTTPException(status_code=401, detail="Invalid credentials")
 
-            access_token = create_access_token({"sub": db_user.email})
-            return {"access_token": access_token, "token_type": "bearer"}
+        user_id, email, name, _, restaurant_ids = db_user
+        access_token = create_access_token(user_claims(user_id, email, name, restaurant_ids or ()))
+        return FastJSONResponse({"access_token": access_token, "token_type": "bearer"})
 
     # Get current user
     @router.get("/me", response_model=UserOut)
@@ -63,15 +92,22 @@ def create_base_router() -> APIRouter:
         if not email:
             raise HTTPException(status_code=401, detail="Invalid token")
 
-        await db_manager.initialize()
-        async_session = await db_manager.get_session()
+        current = CurrentUser.from_claims(payload)
+        if current is not None and current.name is not None:
+            return current
 
-        async with async_session() as session:
-            result = await session.execute(select(User).where(User.email == email))
-            db_user = result.scalar_one_or_none()
-            if not db_user:
+        current = user_cache.get(email)
+        if current is None:
+            async_session = await db_manager.get_session()
+            async with async_session() as session:
+                current = await load_user(session, email)
+            if current is None:
                 raise HTTPException(status_code=404, detail="User not found")
-
-            return db_user
+            user_cache.put(current)
+        return current
     
+    @router.get("/internal/pool-metrics", include_in_schema=False, dependencies=[Depends(require_internal_token)])
+    async def pool_metrics():
+        return db_manager.pool_metrics()
+
     return router
\ No newline at end of file
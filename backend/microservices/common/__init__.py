@@ -0,0 +1 @@
+# Code shared by the auth and customer services
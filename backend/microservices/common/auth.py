@@ -0,0 +1,118 @@
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+SECRET_KEY = os.getenv("JWT_SECRET_KEY", "your_secret_key_here")   # ⚠️ set in production
+ALGORITHM = "HS256"
+ACCESS_TOKEN_EXPIRE_MINUTES = 60
+
+# "jose" (python-jose, default) or "pyjwt"
+JWT_BACKEND = os.getenv("JWT_BACKEND", "jose")
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
+
+
+class InvalidToken(Exception):
+    pass
+
+
+class JoseBackend:
+    def __init__(self):
+        from jose import JWTError, jwt
+        self._jwt = jwt
+        self._error = JWTError
+
+    def encode(self, claims: dict, key: str, algorithm: str) -> str:
+        return self._jwt.encode(claims, key, algorithm=algorithm)
+
+    def decode(self, token: str, key: str, algorithm: str) -> dict:
+        try:
+            return self._jwt.decode(token, key, algorithms=[algorithm])
+        except self._error as e:
+            raise InvalidToken(str(e))
+
+
+class PyJWTBackend:
+    """PyJWT: noticeably cheaper per decode than python-jose for HS256."""
+
+    def __init__(self):
+        import jwt
+        self._jwt = jwt
+
+    def encode(self, claims: dict, key: str, algorithm: str) -> str:
+        return self._jwt.encode(claims, key, algorithm=algorithm)
+
+    def decode(self, token: str, key: str, algorithm: str) -> dict:
+        try:
+            return self._jwt.decode(token, key, algorithms=[algorithm])
+        except self._jwt.PyJWTError as e:
+            raise InvalidToken(str(e))
+
+
+JWT_BACKENDS = {"jose": JoseBackend, "pyjwt": PyJWTBackend}
+
+
+class TokenCache:
+    """
+    LRU of verified claims keyed by the token's SHA-256 digest.
+    Entries are dropped once the token's exp has passed, so a cache hit is
+    never more permissive than a full decode.
+    """
+
+    def __init__(self, maxsize: int = TOKEN_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+
+    def get(self, digest: bytes) -> dict | None:
+        entry = self._entries.get(digest)
+        if entry is None:
+            return None
+        expires_at, claims = entry
+        if expires_at is not None and expires_at <= time.time():
+            del self._entries[digest]
+            return None
+        self._entries.move_to_end(digest)
+        return dict(claims)
+
+    def put(self, digest: bytes, claims: dict):
+        exp = claims.get("exp")
+        self._entries[digest] = (float(exp) if exp is not None else None, dict(claims))
+        self._entries.move_to_end(digest)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+
+_backend = JWT_BACKENDS[JWT_BACKEND]()
+token_cache = TokenCache()
+
+
+def set_jwt_backend(backend):
+    """Swap the JWT implementation (anything with encode/decode like JoseBackend)."""
+    global _backend
+    _backend = backend
+    token_cache.clear()
+
+
+def create_access_token(data: dict, expires_delta: timedelta | None = None):
+    to_encode = data.copy()
+    expire = datetime.utcnow() + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
+    to_encode.update({"exp": expire})
+    return _backend.encode(to_encode, SECRET_KEY, ALGORITHM)
+
+
+def decode_access_token(token: str):
+    """Verified claims, or None if the token is invalid or expired."""
+    digest = hashlib.sha256(token.encode()).digest()
+    claims = token_cache.get(digest)
+    if claims is not None:
+        return claims
+    try:
+        claims = _backend.decode(token, SECRET_KEY, ALGORITHM)
+    except InvalidToken:
+        return None
+    token_cache.put(digest, claims)
+    return claims
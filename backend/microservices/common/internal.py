@@ -0,0 +1,15 @@
+# Guard for operational endpoints under /internal
+import hmac
+import os
+from fastapi import Header, HTTPException
+
+# Shared secret for /internal/* endpoints; while unset they are disabled
+INTERNAL_TOKEN = os.getenv("INTERNAL_TOKEN", "")
+
+
+async def require_internal_token(x_internal_token: str | None = Header(default=None)):
+    """404 unless X-Internal-Token matches INTERNAL_TOKEN, so the route looks absent to everyone else."""
+    if not INTERNAL_TOKEN or x_internal_token is None or not hmac.compare_digest(
+        x_internal_token.encode(), INTERNAL_TOKEN.encode()
+    ):
+        raise HTTPException(status_code=404, detail="Not Found")
@@ -0,0 +1,84 @@
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from sqlalchemy import func, select
+from database.model import Restaurants, User
+
+USER_CACHE_TTL = int(os.getenv("USER_CACHE_TTL", "60"))
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "10000"))
+
+
+@dataclass(frozen=True)
+class CurrentUser:
+    """Authenticated caller, built from token claims without touching the DB."""
+    id: int
+    email: str
+    name: str | None = None
+    restaurant_ids: frozenset = field(default_factory=frozenset)
+
+    @classmethod
+    def from_claims(cls, claims: dict) -> "CurrentUser | None":
+        """None for tokens issued before uid/rids claims existed."""
+        if claims.get("uid") is None or not claims.get("sub"):
+            return None
+        return cls(
+            id=claims["uid"],
+            email=claims["sub"],
+            name=claims.get("name"),
+            restaurant_ids=frozenset(claims.get("rids", ())),
+        )
+
+
+def user_claims(user_id: int, email: str, name: str, restaurant_ids) -> dict:
+    """Claims put in access tokens so services can skip the user lookup."""
+    return {"sub": email, "uid": user_id, "name": name, "rids": sorted(restaurant_ids)}
+
+
+def restaurant_ids_column():
+    """array of the user's restaurant ids, for queries grouped by User.id."""
+    return func.array_remove(func.array_agg(Restaurants.id), None)
+
+
+async def load_user(session, email: str) -> CurrentUser | None:
+    """Fetch a user and their restaurant ids in one query."""
+    result = await session.execute(
+        select(User.id, User.email, User.name, restaurant_ids_column())
+        .outerjoin(Restaurants, Restaurants.user_id == User.id)
+        .where(User.email == email)
+        .group_by(User.id)
+    )
+    row = result.one_or_none()
+    if row is None:
+        return None
+    user_id, email, name, restaurant_ids = row
+    return CurrentUser(user_id, email, name, frozenset(restaurant_ids or ()))
+
+
+class UserCache:
+    """Short-TTL LRU of CurrentUser by email; call invalidate() after changing a user."""
+
+    def __init__(self, ttl: int = USER_CACHE_TTL, maxsize: int = USER_CACHE_SIZE):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+
+    def get(self, email: str) -> CurrentUser | None:
+        entry = self._entries.get(email)
+        if entry is None:
+            return None
+        expires_at, user = entry
+        if expires_at < time.monotonic():
+            del self._entries[email]
+            return None
+        self._entries.move_to_end(email)
+        return user
+
+    def put(self, user: CurrentUser):
+        self._entries[user.email] = (time.monotonic() + self.ttl, user)
+        self._entries.move_to_end(user.email)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, email: str):
+        self._entries.pop(email, None)
@@ -0,0 +1,213 @@
+import asyncio
+import json
+import os
+import time
+from collections import deque
+from sqlalchemy import Boolean, Integer, bindparam, func, update
+from sqlalchemy.dialects.postgresql import ARRAY
+from database.model.menu_items import MenuItem
+from microservices.common.responses import dumps
+from .menu_cache import CachedPayload
+from .http_cache import make_etag
+
+# Toggles kept per restaurant for delta requests; older clients get a full snapshot
+AVAILABILITY_DELTA_LOG = int(os.getenv("AVAILABILITY_DELTA_LOG", "1024"))
+AVAILABILITY_FLUSH_INTERVAL = float(os.getenv("AVAILABILITY_FLUSH_INTERVAL", "0.5"))
+
+AVAILABILITY_EVENT = "menu.availability"
+
+
+def menu_topic(restaurant_id: int) -> str:
+    # Separate from restaurant_topic: order events must not reach customers
+    return f"menu:{restaurant_id}"
+
+
+def next_seq() -> int:
+    # Microsecond clock: roughly comparable across workers without coordination
+    return time.time_ns() // 1000
+
+
+class Bitmap:
+    """Growable bitset over integer keys, offset from the smallest key seen."""
+
+    __slots__ = ("base", "bits")
+
+    def __init__(self):
+        self.base = None
+        self.bits = bytearray()
+
+    def _offset(self, key: int) -> int:
+        if self.base is None:
+            self.base = key - key % 8
+        if key < self.base:
+            base = key - key % 8
+            self.bits[:0] = bytes((self.base - base) // 8)
+            self.base = base
+        offset = key - self.base
+        if offset // 8 >= len(self.bits):
+            self.bits.extend(bytes(offset // 8 - len(self.bits) + 1))
+        return offset
+
+    def set(self, key: int, value: bool):
+        offset = self._offset(key)
+        if value:
+            self.bits[offset // 8] |= 1 << (offset % 8)
+        else:
+            self.bits[offset // 8] &= ~(1 << (offset % 8))
+
+    def get(self, key: int) -> bool:
+        if self.base is None or key < self.base:
+            return False
+        offset = key - self.base
+        if offset // 8 >= len(self.bits):
+            return False
+        return bool(self.bits[offset // 8] & (1 << (offset % 8)))
+
+
+class AvailabilityOverlay:
+    """
+    One restaurant's sold-out toggles on top of the cached menu: `mask` marks
+    items with an override, `value` holds the override.
+    """
+
+    def __init__(self, floor: int):
+        self.mask = Bitmap()
+        self.value = Bitmap()
+        self.seq = floor
+        # Anything older than this was never seen by this worker
+        self.floor = floor
+        self.deltas = deque(maxlen=AVAILABILITY_DELTA_LOG)
+        self._merged = None
+
+    def apply(self, seq: int, available, unavailable):
+        for item_id, value in [(i, True) for i in available] + [(i, False) for i in unavailable]:
+            self.mask.set(item_id, True)
+            self.value.set(item_id, value)
+            if len(self.deltas) == self.deltas.maxlen:
+                self.floor = self.deltas[0][0]
+            self.deltas.append((seq, item_id, value))
+        self.seq = max(self.seq, seq)
+        self._merged = None
+
+    def get(self, item_id: int, default: bool) -> bool:
+        if self.mask.get(item_id):
+            return self.value.get(item_id)
+        return default
+
+    def changes_since(self, since: int) -> dict[int, bool] | None:
+        """{item_id: available} changed after `since`, or None if the log doesn't reach back that far."""
+        if since < self.floor:
+            return None
+        changes = {}
+        for seq, item_id, value in self.deltas:
+            if seq > since:
+                changes[item_id] = value
+        return changes
+
+    def merge(self, cached: CachedPayload) -> CachedPayload:
+        """The cached menu with overrides applied, rebuilt at most once per toggle."""
+        if self.mask.base is None:
+            return cached
+        if self._merged is not None and self._merged[0] is cached:
+            return self._merged[1]
+        items = json.loads(cached.body)
+        for item in items:
+            item["is_available"] = self.get(item["id"], item["is_available"])
+        body = dumps(items)
+        merged = CachedPayload(body, make_etag(body))
+        self._merged = (cached, merged)
+        return merged
+
+
+class AvailabilityBoard:
+    """
+    Per-restaurant overlays, updated from broadcaster events on every worker.
+    Overlays are only created by toggle events, never by reads, so memory
+    grows with restaurants that actually toggled something.
+
+    Deltas are numbered when this worker receives them, not when they were
+    published: events from different workers (or still in flight) can
+    arrive out of publish order, and a seq handed to a client must never be
+    ahead of a toggle the client has not seen yet.
+    """
+
+    def __init__(self):
+        self._overlays = {}
+        # No overlay for a restaurant means no toggles seen since this
+        self.floor = next_seq()
+        self._last_seq = self.floor
+
+    def get(self, restaurant_id: int) -> AvailabilityOverlay | None:
+        return self._overlays.get(restaurant_id)
+
+    def _receive_seq(self) -> int:
+        # Strictly increasing even if the wall clock stalls or steps back
+        self._last_seq = max(self._last_seq + 1, next_seq())
+        return self._last_seq
+
+    def on_event(self, topic: str, event):
+        if event.kind != AVAILABILITY_EVENT:
+            return
+        message = json.loads(event.data)
+        overlay = self._overlays.get(message["restaurant_id"])
+        if overlay is None:
+            # First toggle since the board started, so the log reaches back to its floor
+            overlay = self._overlays[message["restaurant_id"]] = AvailabilityOverlay(self.floor)
+        overlay.apply(self._receive_seq(), message["available"], message["unavailable"])
+
+    def is_available(self, restaurant_id: int, item_id: int, default: bool) -> bool:
+        overlay = self._overlays.get(restaurant_id)
+        return default if overlay is None else overlay.get(item_id, default)
+
+    def merge(self, restaurant_id: int, cached: CachedPayload) -> CachedPayload:
+        overlay = self._overlays.get(restaurant_id)
+        return cached if overlay is None else overlay.merge(cached)
+
+
+class AvailabilityWriter:
+    """
+    Persists toggles to menu_items.is_available in the background. Pending
+    changes are coalesced per item and written with one UPDATE ... FROM
+    unnest(...) per flush, off the request path.
+    """
+
+    def __init__(self, engine, interval: float = AVAILABILITY_FLUSH_INTERVAL):
+        self.engine = engine
+        self.interval = interval
+        self._pending = {}
+
+    def schedule(self, restaurant_id: int, changes: dict[int, bool]):
+        for item_id, value in changes.items():
+            self._pending[(restaurant_id, item_id)] = value
+
+    async def flush(self):
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, {}
+        keys = list(pending)
+        targets = func.unnest(
+            bindparam("ids", [item_id for _, item_id in keys], type_=ARRAY(Integer)),
+            bindparam("restaurant_ids", [restaurant_id for restaurant_id, _ in keys], type_=ARRAY(Integer)),
+            bindparam("values", [pending[key] for key in keys], type_=ARRAY(Boolean)),
+        ).table_valued("id", "restaurant_id", "is_available").render_derived(name="t")
+        try:
+            async with self.engine.begin() as conn:
+                await conn.execute(
+                    update(MenuItem)
+                    .where(MenuItem.id == targets.c.id, MenuItem.restaurant_id == targets.c.restaurant_id)
+                    .values(is_available=targets.c.is_available)
+                )
+        except Exception as e:
+            # Keep the changes for the next flush unless newer ones replaced them
+            for key, value in pending.items():
+                self._pending.setdefault(key, value)
+            print(f"failed to persist availability changes: {e}")
+
+    async def run(self):
+        """Background task for the app lifespan; flushes once more when cancelled."""
+        try:
+            while True:
+                await asyncio.sleep(self.interval)
+                await self.flush()
+        finally:
+            await self.flush()
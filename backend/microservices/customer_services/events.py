@@ -0,0 +1,282 @@
+import asyncio
+import json
+import os
+from collections import defaultdict
+from typing import NamedTuple
+from microservices.common.responses import dumps
+
+# "memory" fans out inside this worker; "postgres" relays through LISTEN/NOTIFY
+# so every worker and replica sees every event
+EVENT_BACKEND = os.getenv("EVENT_BACKEND", "memory")
+EVENT_QUEUE_SIZE = int(os.getenv("EVENT_QUEUE_SIZE", "256"))
+EVENT_HEARTBEAT_SECONDS = float(os.getenv("EVENT_HEARTBEAT_SECONDS", "15"))
+# Backoff cap while the LISTEN connection is being re-established
+EVENT_RECONNECT_MAX_SECONDS = float(os.getenv("EVENT_RECONNECT_MAX_SECONDS", "30"))
+
+
+def restaurant_topic(restaurant_id: int) -> str:
+    return f"restaurant:{restaurant_id}"
+
+
+class Event(NamedTuple):
+    kind: str
+    key: int | None  # order id, for subscribers that follow a single order
+    data: bytes      # JSON, encoded once per event
+    sse: bytes       # ready-to-send Server-Sent Events frame
+
+
+def make_event(data: bytes) -> Event:
+    message = json.loads(data)
+    kind = message.get("type", "message")
+    return Event(kind, message.get("order_id"), data, b"event: " + kind.encode() + b"\ndata: " + data + b"\n\n")
+
+
+class Subscription:
+    """
+    Bounded per-subscriber queue. A subscriber that falls behind loses its
+    oldest events rather than slowing down the publisher; `missed` tells it
+    to resync.
+    """
+
+    def __init__(self, topic: str, key: int | None = None, maxsize: int = EVENT_QUEUE_SIZE):
+        self.topic = topic
+        self.key = key
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        self.missed = 0
+
+    def put(self, event: Event):
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.missed += 1
+        self.queue.put_nowait(event)
+
+    async def get(self, timeout: float | None = None) -> Event | None:
+        """Next event, or None if nothing arrived within timeout."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class InProcessBackend:
+    async def start(self, deliver, resync=None):
+        self._deliver = deliver
+
+    async def stop(self):
+        pass
+
+    async def publish(self, topic: str, data: bytes):
+        self._deliver(topic, data)
+
+    async def publish_many(self, topic: str, datas: list[bytes]):
+        for data in datas:
+            self._deliver(topic, data)
+
+
+class PostgresNotifyBackend:
+    """
+    Publishes with pg_notify through the app's engine and listens on one
+    dedicated asyncpg connection per worker. NOTIFY payloads are capped at
+    8000 bytes, which is plenty for order events.
+
+    If the listening connection drops (database restart, failover, idle
+    timeout) it is re-established with backoff and LISTEN is issued again;
+    `resync` is then called since anything notified meanwhile is lost.
+    """
+
+    channel = "order_events"
+
+    def __init__(self, engine):
+        self.engine = engine
+        self._conn = None
+        self._reconnect_task = None
+
+    async def start(self, deliver, resync=None):
+        self._deliver = deliver
+        self._resync = resync
+        self._conn = await self._listen()
+
+    async def _listen(self):
+        import asyncpg
+
+        url = self.engine.url.set(drivername="postgresql")
+        conn = await asyncpg.connect(url.render_as_string(hide_password=False))
+        await conn.add_listener(self.channel, self._on_notify)
+        conn.add_termination_listener(self._on_terminate)
+        return conn
+
+    def _on_terminate(self, conn):
+        if conn is not self._conn:
+            return  # closed by stop()
+        self._conn = None
+        print("event listener connection lost, reconnecting")
+        self._reconnect_task = asyncio.create_task(self._reconnect())
+
+    async def _reconnect(self):
+        delay = 0.5
+        while True:
+            try:
+                self._conn = await self._listen()
+                break
+            except Exception as e:
+                print(f"event listener reconnect failed, retrying in {delay:g}s: {e}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, EVENT_RECONNECT_MAX_SECONDS)
+        self._reconnect_task = None
+        print("event listener reconnected")
+        if self._resync is not None:
+            self._resync()
+
+    async def stop(self):
+        if self._reconnect_task is not None:
+            self._reconnect_task.cancel()
+            self._reconnect_task = None
+        conn, self._conn = self._conn, None
+        if conn is not None:
+            await conn.close()
+
+    def _on_notify(self, conn, pid, channel, payload: str):
+        topic, _, data = payload.partition(" ")
+        self._deliver(topic, data.encode())
+
+    async def publish(self, topic: str, data: bytes):
+        from sqlalchemy import text
+
+        async with self.engine.connect() as conn:
+            await conn.execute(
+                text("SELECT pg_notify(:channel, :payload)"),
+                {"channel": self.channel, "payload": f"{topic} {data.decode()}"},
+            )
+            await conn.commit()
+
+    async def publish_many(self, topic: str, datas: list[bytes]):
+        from sqlalchemy import text
+
+        # One round trip for a whole batch of events
+        async with self.engine.connect() as conn:
+            await conn.execute(
+                text("SELECT pg_notify(:channel, payload) FROM unnest(CAST(:payloads AS text[])) AS payload"),
+                {"channel": self.channel, "payloads": [f"{topic} {data.decode()}" for data in datas]},
+            )
+            await conn.commit()
+
+
+class Broadcaster:
+    """Topic-based fan-out of order events to SSE/WebSocket subscribers."""
+
+    def __init__(self, backend=None):
+        self.backend = backend or InProcessBackend()
+        self._subscribers = defaultdict(set)
+        self._listeners = []
+
+    async def start(self):
+        await self.backend.start(self._deliver, self._resync)
+
+    async def stop(self):
+        await self.backend.stop()
+
+    def subscribe(self, topic: str, key: int | None = None) -> Subscription:
+        """Subscribe to a topic, optionally only to events for one order id."""
+        subscription = Subscription(topic, key)
+        self._subscribers[topic].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        subscribers = self._subscribers.get(subscription.topic)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[subscription.topic]
+
+    def add_listener(self, callback):
+        """Call callback(topic, event) for every event this worker receives, on any topic."""
+        self._listeners.append(callback)
+
+    def subscriber_count(self, topic: str | None = None) -> int:
+        if topic is not None:
+            return len(self._subscribers.get(topic, ()))
+        return sum(len(s) for s in self._subscribers.values())
+
+    async def publish(self, topic: str, kind: str, payload: dict):
+        await self.backend.publish(topic, dumps({"type": kind, **payload}))
+
+    async def publish_many(self, topic: str, kind: str, payloads: list[dict]):
+        if payloads:
+            await self.backend.publish_many(topic, [dumps({"type": kind, **payload}) for payload in payloads])
+
+    def _resync(self):
+        """Events may have been lost: every subscriber gets a resync."""
+        for subscribers in self._subscribers.values():
+            for subscription in subscribers:
+                subscription.missed += 1
+
+    def _deliver(self, topic: str, data: bytes):
+        subscribers = self._subscribers.get(topic)
+        if not subscribers and not self._listeners:
+            return
+        # Parsed once per event, not once per subscriber
+        event = make_event(data)
+        for listener in self._listeners:
+            try:
+                listener(topic, event)
+            except Exception as e:
+                print(f"event listener failed for {event.kind}: {e}")
+        for subscription in subscribers or ():
+            if subscription.key is None or subscription.key == event.key:
+                subscription.put(event)
+
+
+def create_broadcaster(engine) -> Broadcaster:
+    if EVENT_BACKEND == "postgres":
+        return Broadcaster(PostgresNotifyBackend(engine))
+    return Broadcaster()
+
+
+async def sse_stream(broadcaster: Broadcaster, topic: str, heartbeat: float = EVENT_HEARTBEAT_SECONDS):
+    """Yield SSE frames for a topic until the client disconnects."""
+    subscription = broadcaster.subscribe(topic)
+    try:
+        yield b"retry: 3000\n\n"
+        while True:
+            event = await subscription.get(timeout=heartbeat)
+            if subscription.missed:
+                subscription.missed = 0
+                yield b"event: resync\ndata: {}\n\n"
+            if event is None:
+                yield b": ping\n\n"
+            else:
+                yield event.sse
+    finally:
+        broadcaster.unsubscribe(subscription)
+
+
+async def websocket_stream(websocket, subscription: Subscription, resync, heartbeat: float = EVENT_HEARTBEAT_SECONDS):
+    """
+    Send a subscription's events as JSON text frames until the client
+    disconnects. `resync` is an async callable returning a fresh snapshot,
+    sent whenever the subscriber fell behind and lost events.
+    """
+
+    async def receive():
+        # Clients don't send anything; this is only here to notice disconnects
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+
+    async def send():
+        while True:
+            event = await subscription.get(timeout=heartbeat)
+            if subscription.missed:
+                subscription.missed = 0
+                await websocket.send_text(dumps(await resync()).decode())
+            if event is None:
+                await websocket.send_text('{"type":"ping"}')
+            else:
+                await websocket.send_text(event.data.decode())
+
+    tasks = [asyncio.create_task(receive()), asyncio.create_task(send())]
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
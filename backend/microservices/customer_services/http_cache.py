@@ -0,0 +1,38 @@
+import hashlib
+import os
+from fastapi import Request
+from fastapi.responses import Response
+
+MENU_CACHE_CONTROL = os.getenv(
+    "MENU_CACHE_CONTROL", "public, max-age=30, stale-while-revalidate=300"
+)
+
+
+def make_etag(body: bytes) -> str:
+    """Strong ETag from the payload bytes, so it survives restarts and workers."""
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        # Weak comparison is what If-None-Match specifies
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def cached_json_response(
+    request: Request, body: bytes, etag: str, cache_control: str = MENU_CACHE_CONTROL
+) -> Response:
+    """Return 304 when the client already holds this payload, otherwise the bytes."""
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
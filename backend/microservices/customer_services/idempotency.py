@@ -0,0 +1,93 @@
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, NamedTuple
+
+IDEMPOTENCY_TTL = int(os.getenv("IDEMPOTENCY_TTL", "86400"))
+IDEMPOTENCY_MAX_KEYS = int(os.getenv("IDEMPOTENCY_MAX_KEYS", "100000"))
+
+
+class IdempotencyConflict(Exception):
+    """The key was already used with a different request body."""
+
+
+class _Entry(NamedTuple):
+    expires_at: float
+    fingerprint: str
+    result: asyncio.Future
+
+
+class IdempotencyStore:
+    """
+    In-process store of request results keyed by Idempotency-Key.
+
+    The first request for a key runs the handler; concurrent duplicates
+    await the same future and later retries get the stored result until it
+    expires. Failed requests are forgotten so the client can retry them;
+    duplicates waiting on a request that was cancelled take it over.
+    Every key has the same TTL, so insertion order is expiry order and
+    purging only ever looks at the oldest entries. Entries whose request is
+    still running are kept even past max_keys.
+    """
+
+    def __init__(self, ttl: int = IDEMPOTENCY_TTL, max_keys: int = IDEMPOTENCY_MAX_KEYS):
+        self.ttl = ttl
+        self.max_keys = max_keys
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _purge(self):
+        now = time.monotonic()
+        running = []
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            if entry.expires_at > now and len(self._entries) + len(running) < self.max_keys:
+                break
+            del self._entries[key]
+            if not entry.result.done():
+                # Never evict a request still in flight: its duplicates must
+                # keep joining it rather than run the handler a second time
+                running.append((key, entry))
+        for key, entry in reversed(running):
+            self._entries[key] = entry
+            self._entries.move_to_end(key, last=False)
+
+    async def run(
+        self, key: str, fingerprint: str, handler: Callable[[], Awaitable[Any]]
+    ) -> tuple[Any, bool]:
+        """Return (result, replayed)."""
+        while True:
+            self._purge()
+            entry = self._entries.get(key)
+            if entry is None:
+                break
+            if entry.fingerprint != fingerprint:
+                raise IdempotencyConflict(key)
+            try:
+                # shield: a client hanging up must not cancel the original request
+                return await asyncio.shield(entry.result), True
+            except asyncio.CancelledError:
+                if not entry.result.cancelled() or asyncio.current_task().cancelling():
+                    raise
+                # The original request was cancelled, not this one. Its key is
+                # forgotten, so run the handler here (or join whichever
+                # duplicate got there first) instead of failing with a 500
+
+        future = asyncio.get_running_loop().create_future()
+        self._entries[key] = _Entry(time.monotonic() + self.ttl, fingerprint, future)
+        try:
+            result = await handler()
+        except asyncio.CancelledError:
+            self._entries.pop(key, None)
+            future.cancel()
+            raise
+        except Exception as e:
+            self._entries.pop(key, None)
+            future.set_exception(e)
+            future.exception()  # mark retrieved when nobody was waiting
+            raise
+        future.set_result(result)
+        return result, False
@@ -1,8 +1,32 @@
+import asyncio
+from contextlib import asynccontextmanager, suppress
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from .router import create_base_router
+from microservices.common.responses import FastJSONResponse
+from database.partitions import maintenance_loop
+from .router import availability_writer, broadcaster, create_base_router, db_manager, qr_cache
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Schema check runs once here instead of on every request
+    await db_manager.initialize()
+    await broadcaster.start()
+    # Keep order partitions created ahead of time
+    partition_task = asyncio.create_task(maintenance_loop(db_manager.engine))
+    # Sold-out toggles are written to menu_items off the request path
+    availability_task = asyncio.create_task(availability_writer.run())
+    yield
+    for task in (partition_task, availability_task):
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+    await broadcaster.stop()
+    qr_cache.shutdown()
+    await db_manager.dispose()
+
+
+app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
 
 # Allow React frontend to communicate
 origins = [
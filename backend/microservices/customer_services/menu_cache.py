@@ -0,0 +1,147 @@
+import json
+import os
+import time
+import uuid
+from collections import OrderedDict
+from typing import NamedTuple
+from .http_cache import make_etag
+
+MENU_CACHE_SIZE = int(os.getenv("MENU_CACHE_SIZE", "512"))
+# "local" swaps in LocalSharedTier; leave empty to run with the in-process tier only
+MENU_SHARED_CACHE = os.getenv("MENU_SHARED_CACHE", "")
+MENU_SHARED_CACHE_TTL = int(os.getenv("MENU_SHARED_CACHE_TTL", "3600"))
+# Categories are only written by menu imports, so they are refreshed on a timer
+CATEGORY_CACHE_TTL = int(os.getenv("CATEGORY_CACHE_TTL", "300"))
+
+MENU_VERSION_EVENT = "menu.version"
+
+
+class CachedPayload(NamedTuple):
+    body: bytes
+    etag: str
+
+
+class LocalSharedTier:
+    """
+    In-process stand-in for a shared cache such as Redis.
+    A real backend only needs the same three coroutines: get, set and incr.
+    """
+
+    def __init__(self):
+        self._data = {}
+
+    async def get(self, key: str):
+        return self._data.get(key)
+
+    async def set(self, key: str, value, ttl: int | None = None):
+        self._data[key] = value
+
+    async def incr(self, key: str) -> int:
+        value = int(self._data.get(key, 0)) + 1
+        self._data[key] = value
+        return value
+
+
+class MenuCache:
+    """
+    Per-restaurant menu payloads keyed by (restaurant_id, menu version).
+    Writers call bump() after any menu mutation; older versions are never
+    read again and simply age out of the LRU.
+
+    Without a shared tier each worker keeps its own versions, so a bump is
+    also broadcast as a menu.version event and on_event bumps every other
+    worker's copy.
+    """
+
+    def __init__(self, maxsize: int = MENU_CACHE_SIZE, shared=None):
+        self.maxsize = maxsize
+        self.shared = shared
+        # Tells this worker's own menu.version events apart from the others'
+        self.origin = uuid.uuid4().hex
+        self._versions = {}
+        self._lru = OrderedDict()
+        self._price_index = OrderedDict()
+        self._categories = None
+        self._categories_expire = 0.0
+
+    async def version(self, restaurant_id: int) -> int:
+        if self.shared is not None:
+            return int(await self.shared.get(f"menu:version:{restaurant_id}") or 0)
+        return self._versions.get(restaurant_id, 0)
+
+    async def bump(self, restaurant_id: int) -> int:
+        if self.shared is not None:
+            return await self.shared.incr(f"menu:version:{restaurant_id}")
+        version = self._versions.get(restaurant_id, 0) + 1
+        self._versions[restaurant_id] = version
+        return version
+
+    def version_event(self, restaurant_id: int, version: int) -> dict:
+        return {"restaurant_id": restaurant_id, "version": version, "origin": self.origin}
+
+    def on_event(self, topic: str, event):
+        if event.kind != MENU_VERSION_EVENT or self.shared is not None:
+            return
+        message = json.loads(event.data)
+        if message["origin"] != self.origin:
+            restaurant_id = message["restaurant_id"]
+            self._versions[restaurant_id] = self._versions.get(restaurant_id, 0) + 1
+
+    async def get(self, restaurant_id: int, version: int) -> CachedPayload | None:
+        key = (restaurant_id, version)
+        entry = self._lru.get(key)
+        if entry is not None:
+            self._lru.move_to_end(key)
+            return entry
+        if self.shared is not None:
+            body = await self.shared.get(f"menu:{restaurant_id}:{version}")
+            if body is not None:
+                entry = self._store(key, body)
+        return entry
+
+    async def put(self, restaurant_id: int, version: int, body: bytes) -> CachedPayload:
+        entry = self._store((restaurant_id, version), body)
+        if self.shared is not None:
+            await self.shared.set(f"menu:{restaurant_id}:{version}", body, ttl=MENU_SHARED_CACHE_TTL)
+        return entry
+
+    def get_price_index(self, restaurant_id: int, version: int) -> dict | None:
+        """{menu_item_id: (price, is_available)} for pricing orders server-side."""
+        key = (restaurant_id, version)
+        index = self._price_index.get(key)
+        if index is not None:
+            self._price_index.move_to_end(key)
+        return index
+
+    def put_price_index(self, restaurant_id: int, version: int, index: dict):
+        key = (restaurant_id, version)
+        self._price_index[key] = index
+        self._price_index.move_to_end(key)
+        while len(self._price_index) > self.maxsize:
+            self._price_index.popitem(last=False)
+
+    def get_categories(self) -> CachedPayload | None:
+        if time.monotonic() < self._categories_expire:
+            return self._categories
+        return None
+
+    def put_categories(self, body: bytes) -> CachedPayload:
+        self._categories = CachedPayload(body, make_etag(body))
+        self._categories_expire = time.monotonic() + CATEGORY_CACHE_TTL
+        return self._categories
+
+    def invalidate_categories(self):
+        self._categories_expire = 0.0
+
+    def _store(self, key, body: bytes) -> CachedPayload:
+        entry = CachedPayload(body, make_etag(body))
+        self._lru[key] = entry
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.maxsize:
+            self._lru.popitem(last=False)
+        return entry
+
+
+def create_menu_cache() -> MenuCache:
+    shared = LocalSharedTier() if MENU_SHARED_CACHE == "local" else None
+    return MenuCache(shared=shared)
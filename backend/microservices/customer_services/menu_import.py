@@ -0,0 +1,212 @@
+import codecs
+import csv
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from sqlalchemy import select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from pydantic import ValidationError
+from database.model.menu_category import MenuCategory
+from .schema import MenuItemImport
+
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", "1000"))
+# Give up once this many rows were rejected; the whole import rolls back
+IMPORT_MAX_ERRORS = int(os.getenv("IMPORT_MAX_ERRORS", "100"))
+
+COPY_COLUMNS = ["restaurant_id", "category_id", "name", "description", "price", "image_url", "is_available"]
+
+
+class ImportAborted(Exception):
+    pass
+
+
+@dataclass
+class ImportProgress:
+    restaurant_id: int
+    format: str
+    rows: int = 0
+    imported: int = 0
+    categories_created: int = 0
+    errors: list = field(default_factory=list)
+    state: str = "running"
+    started_at: float = field(default_factory=time.time)
+    finished_at: float | None = None
+
+    def as_dict(self) -> dict:
+        return {
+            "restaurant_id": self.restaurant_id,
+            "format": self.format,
+            "state": self.state,
+            "rows": self.rows,
+            "imported": self.imported,
+            "rejected": len(self.errors),
+            "categories_created": self.categories_created,
+            "errors": self.errors,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+async def iter_lines(chunks):
+    """Decode a byte stream incrementally and yield complete lines (without newline)."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = ""
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield buffer.rstrip("\r")
+
+
+async def iter_csv_records(lines):
+    """
+    (line_number, {column: value}) per CSV record. Lines are grouped until
+    their quotes balance, so quoted fields may span lines, and each group is
+    parsed on its own: only one record is ever held in memory.
+    """
+    header = None
+    pending = []
+    quotes = 0
+    start = 0
+    number = 0
+    async for line in lines:
+        number += 1
+        if not pending:
+            start = number
+        pending.append(line + "\n")
+        quotes += line.count('"')
+        if quotes % 2:
+            continue
+        for values in csv.reader(pending):
+            if header is None:
+                header = [name.strip().lower() for name in values]
+            elif any(values):
+                yield start, dict(zip(header, values))
+        pending.clear()
+        quotes = 0
+    if pending:
+        raise ImportAborted(f"line {start}: unterminated quoted field")
+
+
+async def iter_jsonl_records(lines):
+    number = 0
+    async for line in lines:
+        number += 1
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield number, e
+            continue
+        yield number, record
+
+
+def _clean_csv(record: dict) -> dict:
+    # Empty cells mean "not given", so the schema defaults apply
+    return {key: value.strip() for key, value in record.items() if key and value is not None and value.strip() != ""}
+
+
+class MenuImporter:
+    """
+    Streams rows into app.menu_items: parse, validate and COPY one chunk at
+    a time inside a single transaction, so a failed import leaves nothing
+    behind and memory stays bounded by IMPORT_CHUNK_SIZE.
+    """
+
+    def __init__(self, session, progress: ImportProgress, chunk_size: int = IMPORT_CHUNK_SIZE):
+        self.session = session
+        self.progress = progress
+        self.chunk_size = chunk_size
+        self._category_ids = {}
+        self._known_category_ids = set()
+        self._begun = False
+
+    def _reject(self, line: int, error: str):
+        self.progress.errors.append({"line": line, "error": error})
+        if len(self.progress.errors) > IMPORT_MAX_ERRORS:
+            raise ImportAborted(f"more than {IMPORT_MAX_ERRORS} invalid rows")
+
+    async def run(self, records) -> ImportProgress:
+        chunk = []
+        async for line, record in records:
+            self.progress.rows += 1
+            if isinstance(record, Exception):
+                self._reject(line, f"invalid JSON: {record}")
+                continue
+            if not isinstance(record, dict):
+                self._reject(line, "expected an object")
+                continue
+            if self.progress.format == "csv":
+                record = _clean_csv(record)
+            try:
+                chunk.append((line, MenuItemImport.model_validate(record)))
+            except ValidationError as e:
+                self._reject(line, "; ".join(
+                    f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors()
+                ))
+                continue
+            if len(chunk) >= self.chunk_size:
+                await self._write(chunk)
+                chunk = []
+        if chunk:
+            await self._write(chunk)
+        return self.progress
+
+    async def _resolve_categories(self, chunk):
+        names = {item.category for _, item in chunk if item.category and item.category_id is None}
+        missing = names.difference(self._category_ids)
+        if missing:
+            # Categories are shared across restaurants: create unknown names once
+            result = await self.session.execute(
+                pg_insert(MenuCategory)
+                .values([{"name": name} for name in sorted(missing)])
+                .on_conflict_do_nothing(index_elements=["name"])
+                .returning(MenuCategory.id)
+            )
+            self.progress.categories_created += len(result.all())
+            rows = await self.session.execute(
+                select(MenuCategory.id, MenuCategory.name).where(MenuCategory.name.in_(missing))
+            )
+            self._category_ids.update({name: id for id, name in rows.all()})
+
+        ids = {item.category_id for _, item in chunk if item.category_id is not None}
+        unknown = ids.difference(self._known_category_ids)
+        if unknown:
+            found = await self.session.scalars(select(MenuCategory.id).where(MenuCategory.id.in_(unknown)))
+            self._known_category_ids.update(found.all())
+
+    async def _write(self, chunk):
+        await self._resolve_categories(chunk)
+        restaurant_id = self.progress.restaurant_id
+        records = []
+        for line, item in chunk:
+            category_id = item.category_id
+            if category_id is None and item.category:
+                category_id = self._category_ids.get(item.category)
+            elif category_id is not None and category_id not in self._known_category_ids:
+                self._reject(line, f"category_id: unknown category {category_id}")
+                continue
+            records.append((
+                restaurant_id, category_id, item.name, item.description,
+                item.price, item.image_url, item.is_available,
+            ))
+        if not records:
+            return
+
+        # COPY is the fastest way into Postgres, but it goes straight to
+        # asyncpg, and the dialect only sends BEGIN with the first statement
+        # SQLAlchemy itself runs. Without one, each COPY would autocommit.
+        if not self._begun:
+            await self.session.execute(text("SELECT 1"))
+            self._begun = True
+        connection = await self.session.connection()
+        raw = await connection.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(
+            "menu_items", schema_name="app", columns=COPY_COLUMNS, records=records
+        )
+        self.progress.imported += len(records)
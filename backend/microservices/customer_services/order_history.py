@@ -0,0 +1,100 @@
+import base64
+import datetime
+import os
+from sqlalchemy import select, tuple_
+from database.model.orders import Orders
+from database.model import OrderItem
+from microservices.common.responses import dumps
+
+ORDER_PAGE_SIZE = int(os.getenv("ORDER_PAGE_SIZE", "50"))
+ORDER_PAGE_MAX = int(os.getenv("ORDER_PAGE_MAX", "200"))
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(created_at: datetime.datetime, order_id: int) -> str:
+    raw = f"{created_at.isoformat()}|{order_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime.datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, order_id = raw.split("|")
+        return datetime.datetime.fromisoformat(created_at), int(order_id)
+    except ValueError as e:
+        raise InvalidCursor(str(e)) from e
+
+
+async def load_order_page(
+    session,
+    restaurant_id: int,
+    limit: int,
+    cursor: str | None = None,
+    status: str | None = None,
+    table_number: int | None = None,
+):
+    """
+    One page of a restaurant's orders, newest first, and the cursor for the
+    next page (None on the last one).
+
+    Keyset pagination on (created_at, id): each page seeks straight to the
+    cursor in ix_orders_restaurant_created_id (or the status index), so page
+    1000 costs the same as page 1, and the created_at bound prunes every
+    later monthly partition. Items for the whole page come from one query.
+    """
+    query = (
+        select(Orders.id, Orders.created_at, Orders.table_number, Orders.status, Orders.version, Orders.total_amount)
+        .where(Orders.restaurant_id == restaurant_id)
+        .order_by(Orders.created_at.desc(), Orders.id.desc())
+        .limit(limit + 1)
+    )
+    if cursor:
+        created_at, order_id = decode_cursor(cursor)
+        query = query.where(tuple_(Orders.created_at, Orders.id) < tuple_(created_at, order_id))
+    if status is not None:
+        query = query.where(Orders.status == status)
+    if table_number is not None:
+        query = query.where(Orders.table_number == table_number)
+
+    orders = (await session.execute(query)).all()
+    next_cursor = None
+    if len(orders) > limit:
+        orders = orders[:limit]
+        next_cursor = encode_cursor(orders[-1].created_at, orders[-1].id)
+
+    items = {}
+    if orders:
+        # order_created_at bounds let Postgres skip order_items partitions
+        result = await session.execute(
+            select(OrderItem.order_id, OrderItem.menu_item_id, OrderItem.quantity, OrderItem.price)
+            .where(
+                OrderItem.order_id.in_([order.id for order in orders]),
+                OrderItem.order_created_at.between(orders[-1].created_at, orders[0].created_at),
+            )
+            .order_by(OrderItem.order_id, OrderItem.id)
+        )
+        for order_id, menu_item_id, quantity, price in result:
+            items.setdefault(order_id, []).append(
+                {"menu_item_id": menu_item_id, "quantity": quantity, "price": price}
+            )
+    return orders, items, next_cursor
+
+
+async def stream_order_page(restaurant_id: int, orders, items, next_cursor):
+    """Serialize a loaded page one order at a time instead of as one large body."""
+    yield b'{"restaurant_id":' + dumps(restaurant_id) + b',"orders":['
+    for index, order in enumerate(orders):
+        body = dumps({
+            "order_id": order.id,
+            "created_at": order.created_at,
+            "table_number": order.table_number,
+            "status": order.status,
+            "version": order.version,
+            "total_amount": order.total_amount,
+            "items": items.get(order.id, []),
+        })
+        yield body if index == 0 else b"," + body
+    yield b'],"next_cursor":' + dumps(next_cursor) + b"}"
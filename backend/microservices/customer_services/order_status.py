@@ -0,0 +1,92 @@
+import datetime
+from typing import NamedTuple
+from sqlalchemy import Integer, bindparam, func, select, update
+from sqlalchemy.dialects.postgresql import ARRAY
+from database.model.orders import Orders
+from .sales_rollup import reverse_order_sales
+
+# pending -> accepted -> preparing -> ready -> served, cancellable until served
+TRANSITIONS = {
+    "pending": ("accepted", "cancelled"),
+    "accepted": ("preparing", "cancelled"),
+    "preparing": ("ready", "cancelled"),
+    "ready": ("served", "cancelled"),
+    "served": (),
+    "cancelled": (),
+}
+ORDER_STATUSES = tuple(TRANSITIONS)
+FINAL_STATUSES = frozenset(status for status, targets in TRANSITIONS.items() if not targets)
+
+
+def sources_for(target: str) -> list[str]:
+    """Statuses an order may move to `target` from."""
+    return [status for status, targets in TRANSITIONS.items() if target in targets]
+
+
+class Transitioned(NamedTuple):
+    order_id: int
+    status: str
+    version: int
+    table_number: int | None
+    created_at: datetime.datetime
+
+
+async def load_order_status(session, order_id: int, restaurant_id: int, table_number: int):
+    """(status, version) of an order placed at this table, or None."""
+    return (await session.execute(
+        select(Orders.status, Orders.version).where(
+            Orders.id == order_id,
+            Orders.restaurant_id == restaurant_id,
+            Orders.table_number == table_number,
+        )
+    )).first()
+
+
+async def transition_orders(session, restaurant_id: int, target: str, orders: dict[int, int | None]):
+    """
+    Move orders {order_id: expected version or None} to `target` in one
+    UPDATE ... FROM unnest(...). An order is only updated if it belongs to
+    the restaurant, its current status may move to `target` and, when a
+    version is given, the version still matches.
+
+    Returns (updated, rejected) where rejected maps order_id to a reason.
+    """
+    ids = list(orders)
+    targets = func.unnest(
+        bindparam("ids", ids, type_=ARRAY(Integer)),
+        bindparam("versions", [orders[i] for i in ids], type_=ARRAY(Integer)),
+    ).table_valued("id", "version").render_derived(name="t")
+    result = await session.execute(
+        update(Orders)
+        .where(
+            Orders.id == targets.c.id,
+            Orders.restaurant_id == restaurant_id,
+            Orders.status.in_(sources_for(target)),
+            (targets.c.version.is_(None)) | (Orders.version == targets.c.version),
+        )
+        .values(status=target, version=Orders.version + 1)
+        .returning(Orders.id, Orders.status, Orders.version, Orders.table_number, Orders.created_at)
+        .execution_options(synchronize_session=False)
+    )
+    updated = [Transitioned(*row) for row in result.all()]
+    if target == "cancelled":
+        # Same transaction: the rollup never counts a cancelled order
+        await reverse_order_sales(session, restaurant_id, [(order.order_id, order.created_at) for order in updated])
+
+    missing = set(ids).difference(order.order_id for order in updated)
+    rejected = {}
+    if missing:
+        # Only the misses pay for a second look, to say why
+        current = await session.execute(
+            select(Orders.id, Orders.status, Orders.version).where(
+                Orders.id.in_(missing), Orders.restaurant_id == restaurant_id
+            )
+        )
+        for order_id, status, version in current.all():
+            if status not in sources_for(target):
+                rejected[order_id] = f"cannot move from {status} to {target}"
+            else:
+                rejected[order_id] = f"version conflict (current version {version})"
+        for order_id in missing.difference(rejected):
+            rejected[order_id] = "not found"
+    return updated, rejected
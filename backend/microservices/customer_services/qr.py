@@ -0,0 +1,172 @@
+import asyncio
+import hashlib
+import io
+import multiprocessing
+import os
+import tempfile
+import zipfile
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+import qrcode
+
+# Customer-facing order page; QR codes point at <base>/<restaurant_id>?table=<n>
+QR_BASE_URL = os.getenv("QR_BASE_URL", "http://localhost:3000/order").rstrip("/")
+QR_BOX_SIZE = int(os.getenv("QR_BOX_SIZE", "10"))
+QR_BORDER = int(os.getenv("QR_BORDER", "4"))
+QR_CACHE_SIZE = int(os.getenv("QR_CACHE_SIZE", "1024"))
+# Empty disables the disk tier
+QR_CACHE_DIR = os.getenv("QR_CACHE_DIR", os.path.join(tempfile.gettempdir(), "qr-cache"))
+# 0 renders on a thread instead of a process pool
+QR_RENDER_WORKERS = int(os.getenv("QR_RENDER_WORKERS", str(os.cpu_count() or 1)))
+QR_MAX_TABLES = int(os.getenv("QR_MAX_TABLES", "500"))
+QR_CACHE_CONTROL = os.getenv("QR_CACHE_CONTROL", "public, max-age=86400")
+
+# Part of every cache key, so a change in rendering never serves stale images
+_RENDER_PARAMS = f"{QR_BOX_SIZE}|{QR_BORDER}|{getattr(qrcode, '__version__', '')}"
+
+
+def qr_url(restaurant_id: int, table_number: int | None = None) -> str:
+    url = f"{QR_BASE_URL}/{restaurant_id}"
+    if table_number is not None:
+        url += f"?table={table_number}"
+    return url
+
+
+def qr_key(data: str) -> str:
+    """Content hash of everything that determines the image bytes."""
+    return hashlib.blake2b(f"{_RENDER_PARAMS}|{data}".encode(), digest_size=16).hexdigest()
+
+
+def qr_etag(key: str) -> str:
+    # Derived from the input, so a 304 needs no rendering or cache lookup
+    return f'"qr-{key}"'
+
+
+def render_qr_png(data: str) -> bytes:
+    """Runs in a worker process: keep it a plain top-level function."""
+    qr = qrcode.QRCode(box_size=QR_BOX_SIZE, border=QR_BORDER)
+    qr.add_data(data)
+    qr.make(fit=True)
+    buf = io.BytesIO()
+    qr.make_image().save(buf, format="PNG")
+    return buf.getvalue()
+
+
+class QRCache:
+    """PNG bytes by content hash: an in-memory LRU in front of a directory."""
+
+    def __init__(self, maxsize: int = QR_CACHE_SIZE, directory: str = QR_CACHE_DIR, workers: int = QR_RENDER_WORKERS):
+        self.maxsize = maxsize
+        self.directory = directory
+        self.workers = workers
+        self._lru = OrderedDict()
+        self._pool = None
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.png")
+
+    def _read_disk(self, key: str) -> bytes | None:
+        try:
+            with open(self._path(key), "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _write_disk(self, key: str, png: bytes):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            # Write then rename, so readers never see a partial file
+            fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(png)
+            os.replace(tmp, self._path(key))
+        except OSError as e:
+            print(f"failed to cache QR code {key} on disk: {e}")
+
+    def _remember(self, key: str, png: bytes):
+        self._lru[key] = png
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.maxsize:
+            self._lru.popitem(last=False)
+
+    async def _render(self, data: str) -> bytes:
+        if self.workers <= 0:
+            return await asyncio.to_thread(render_qr_png, data)
+        if self._pool is None:
+            # Forking a process that is running an event loop and holding pool
+            # connections copies both into the worker; start workers from a
+            # clean forkserver (spawn where that is unavailable) instead
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context(method))
+        return await asyncio.get_running_loop().run_in_executor(self._pool, render_qr_png, data)
+
+    async def get(self, data: str) -> tuple[bytes, str]:
+        """(png, etag) for a QR payload, rendering it at most once per process."""
+        key = qr_key(data)
+        png = self._lru.get(key)
+        if png is not None:
+            self._lru.move_to_end(key)
+            return png, qr_etag(key)
+
+        if self.directory:
+            png = await asyncio.to_thread(self._read_disk, key)
+        if png is None:
+            png = await self._render(data)
+            if self.directory:
+                await asyncio.to_thread(self._write_disk, key, png)
+        self._remember(key, png)
+        return png, qr_etag(key)
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+class _ChunkWriter:
+    """Write-only file object for zipfile; the stream is drained as it is written."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+async def qr_zip_stream(cache: QRCache, restaurant_id: int, tables: int, window: int | None = None):
+    """
+    Yield a ZIP of table_<n>.png for tables 1..tables. Codes render in
+    parallel, at most `window` at a time, and each file is sent as soon as
+    it and every file before it are done, so memory stays bounded.
+    """
+    window = window or max(cache.workers, 1) * 2
+    writer = _ChunkWriter()
+    # PNGs are already compressed; the writer has no tell(), so zipfile
+    # streams with data descriptors instead of seeking back
+    archive = zipfile.ZipFile(writer, "w", compression=zipfile.ZIP_STORED)
+    pending = deque()
+    next_table = 1
+    try:
+        while pending or next_table <= tables:
+            while next_table <= tables and len(pending) < window:
+                data = qr_url(restaurant_id, next_table)
+                pending.append((next_table, asyncio.ensure_future(cache.get(data))))
+                next_table += 1
+            table_number, task = pending.popleft()
+            png, _ = await task
+            archive.writestr(zipfile.ZipInfo(f"table_{table_number}.png", (1980, 1, 1, 0, 0, 0)), png)
+            yield writer.drain()
+        archive.close()
+        yield writer.drain()
+    finally:
+        for _, task in pending:
+            task.cancel()
@@ -1,27 +1,55 @@
+import datetime
+import hashlib
+import json
 import time
-from fastapi import APIRouter, Depends, HTTPException, Request
-from sqlalchemy import insert, select
-from sqlalchemy.orm import selectinload
-from fastapi.responses import StreamingResponse
-import qrcode
-import io
+from decimal import Decimal
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, WebSocket
+from sqlalchemy import delete, insert, select, update
+from fastapi.responses import Response, StreamingResponse
 from database.model.menu_items import MenuItem
 from database.model.menu_category import MenuCategory
 from database.model.orders import Orders
 from database.model import OrderItem
-from database.model import User
 from database.model import Restaurants
-from database.db_manager import AsyncDatabaseManager
+from database.db_manager import get_db_manager
 from sqlalchemy.exc import SQLAlchemyError
-from .schema import OrderRequestBody, RestaurantCreate
+from .schema import OrderRequestBody, RestaurantCreate, MenuItemOut, MenuCategoryRef, menu_items_adapter
+from .schema import OrderStatusUpdate, OrderStatusChange, MenuPatch, AvailabilityUpdate
 from .utils import decode_access_token
+from .menu_cache import MENU_VERSION_EVENT, create_menu_cache
+from .http_cache import cached_json_response, etag_matches
+from .idempotency import IdempotencyConflict, IdempotencyStore
+from .events import create_broadcaster, restaurant_topic, sse_stream, websocket_stream
+from .order_status import ORDER_STATUSES, load_order_status, transition_orders
+from .menu_import import ImportAborted, ImportProgress, MenuImporter, iter_csv_records, iter_jsonl_records, iter_lines
+from .availability import AVAILABILITY_EVENT, AvailabilityBoard, AvailabilityWriter, menu_topic
+from .order_history import ORDER_PAGE_MAX, ORDER_PAGE_SIZE, InvalidCursor, load_order_page, stream_order_page
+from .sales_rollup import REPORT_GROUPS, as_naive_utc, load_sales_report, record_order_sales
+from .qr import QR_CACHE_CONTROL, QR_MAX_TABLES, QRCache, qr_etag, qr_key, qr_url, qr_zip_stream
 from fastapi.security import OAuth2PasswordBearer
+from microservices.common.responses import FastJSONResponse, dumps
+from microservices.common.internal import require_internal_token
+from microservices.common.users import CurrentUser, UserCache, load_user
 
 # Create a single DB manager instance
-db_manager = AsyncDatabaseManager()
+db_manager = get_db_manager()
+menu_cache = create_menu_cache()
+idempotency_store = IdempotencyStore()
+user_cache = UserCache()
+broadcaster = create_broadcaster(db_manager.engine)
+qr_cache = QRCache()
+# Sold-out toggles: applied from events on every worker, persisted in the background
+availability = AvailabilityBoard()
+broadcaster.add_listener(availability.on_event)
+# Menu version bumps reach the other workers' caches the same way
+broadcaster.add_listener(menu_cache.on_event)
+availability_writer = AvailabilityWriter(db_manager.engine)
+# Latest menu import per restaurant, for progress polling (this worker only)
+menu_imports: dict[int, ImportProgress] = {}
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
-async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
-    payload = decode_access_token(token)
+async def resolve_user(token: str | None) -> CurrentUser:
+    payload = decode_access_token(token) if token else None
     if not payload:
         raise HTTPException(status_code=401, detail="Invalid or expired token")
 
@@ -29,45 +57,328 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
     if not email:
         raise HTTPException(status_code=401, detail="Invalid token")
 
+    # Tokens carry uid/rids, so the common case never queries users
+    current_user = CurrentUser.from_claims(payload)
+    if current_user is not None:
+        return current_user
+
+    # Older tokens: look the user up once and keep it for a short TTL
+    current_user = user_cache.get(email)
+    if current_user is None:
+        async_session = await db_manager.get_session()
+        async with async_session() as session:
+            current_user = await load_user(session, email)
+        if current_user is None:
+            raise HTTPException(status_code=404, detail="User not found")
+        user_cache.put(current_user)
+    return current_user
+
+async def get_current_user(token: str = Depends(oauth2_scheme)) -> CurrentUser:
+    return await resolve_user(token)
+
+async def get_stream_user(request: Request, access_token: Optional[str] = None) -> CurrentUser:
+    """Like get_current_user, but EventSource/WebSocket clients may pass ?access_token=."""
+    authorization = request.headers.get("authorization", "")
+    if authorization.lower().startswith("bearer "):
+        access_token = authorization[7:]
+    return await resolve_user(access_token)
+
+async def ensure_owner(current_user: CurrentUser, restaurant_id: int):
+    """403 unless the caller owns the restaurant."""
+    if restaurant_id in current_user.restaurant_ids:
+        return
+    # Restaurants created after the token was issued are not in its claims
     async_session = await db_manager.get_session()
     async with async_session() as session:
-        result = await session.execute(select(User).where(User.email == email))
-        db_user = result.scalar_one_or_none()
-        if not db_user:
-            raise HTTPException(status_code=404, detail="User not found")
-        return db_user
+        owner_id = await session.scalar(select(Restaurants.user_id).where(Restaurants.id == restaurant_id))
+    if owner_id is None or owner_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Not your restaurant")
+
+async def get_price_index(session, restaurant_id: int) -> dict:
+    """{menu_item_id: (price, is_available)} for a restaurant, cached per menu version."""
+    version = await menu_cache.version(restaurant_id)
+    prices = menu_cache.get_price_index(restaurant_id, version)
+    if prices is None:
+        result = await session.execute(
+            select(MenuItem.id, MenuItem.price, MenuItem.is_available)
+            .where(MenuItem.restaurant_id == restaurant_id)
+        )
+        prices = {item_id: (price, is_available) for item_id, price, is_available in result}
+        menu_cache.put_price_index(restaurant_id, version, prices)
+    return prices
+
+async def publish_availability(restaurant_id: int, changes: dict[int, bool]):
+    """Broadcast availability changes; every worker's overlay numbers and applies them on receipt."""
+    await broadcaster.publish(menu_topic(restaurant_id), AVAILABILITY_EVENT, {
+        "restaurant_id": restaurant_id,
+        "available": [item_id for item_id, value in changes.items() if value],
+        "unavailable": [item_id for item_id, value in changes.items() if not value],
+    })
+
+async def bump_menu(restaurant_id: int) -> int:
+    """New menu version here, then on every other worker; never fails the request."""
+    version = await menu_cache.bump(restaurant_id)
+    try:
+        await broadcaster.publish(
+            menu_topic(restaurant_id), MENU_VERSION_EVENT, menu_cache.version_event(restaurant_id, version)
+        )
+    except Exception as e:
+        print(f"failed to publish menu version for restaurant {restaurant_id}: {e}")
+    return version
+
+async def publish_order_event(kind: str, order: dict):
+    """Push an order event to the restaurant's subscribers; never fails the request."""
+    try:
+        await broadcaster.publish(restaurant_topic(order["restaurant_id"]), kind, order)
+    except Exception as e:
+        print(f"failed to publish {kind} for order {order.get('order_id')}: {e}")
+
+async def change_order_status(restaurant_id: int, target: str, orders: dict[int, int | None]):
+    """Apply one status transition to many orders, then notify kitchens and tables."""
+    if target not in ORDER_STATUSES:
+        raise HTTPException(status_code=422, detail=f"Unknown status {target!r}")
+
+    async_session = await db_manager.get_session()
+    async with async_session() as session:
+        try:
+            updated, rejected = await transition_orders(session, restaurant_id, target, orders)
+            await session.commit()
+        except SQLAlchemyError as e:
+            await session.rollback()
+            raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+    try:
+        await broadcaster.publish_many(restaurant_topic(restaurant_id), "order.status", [
+            {
+                "order_id": order.order_id,
+                "restaurant_id": restaurant_id,
+                "table_number": order.table_number,
+                "status": order.status,
+                "version": order.version,
+            }
+            for order in updated
+        ])
+    except Exception as e:
+        print(f"failed to publish status changes for restaurant {restaurant_id}: {e}")
+    return updated, rejected
+
+async def get_order_status(order_id: int, restaurant_id: int, table_number: int) -> dict | None:
+    """Current status of an order, as the same message shape the live feeds use."""
+    async_session = await db_manager.get_session()
+    async with async_session() as session:
+        row = await load_order_status(session, order_id, restaurant_id, table_number)
+    if row is None:
+        return None
+    return {
+        "type": "order.status",
+        "order_id": order_id,
+        "restaurant_id": restaurant_id,
+        "status": row.status,
+        "version": row.version,
+    }
+
+async def place_order(request: OrderRequestBody) -> FastJSONResponse:
+    """Validate, price and insert an order in a single transaction."""
+    async_session = await db_manager.get_session()
+
+    async with async_session() as session:
+        try:
+            if not request.order_items:
+                raise HTTPException(status_code=400, detail="No items in order.")
+
+            # Price lines from the cached menu; the index is built by the same
+            # query that checks items exist, belong here and are available
+            prices = await get_price_index(session, request.restaurant_id)
+            lines = []
+            total_amount = Decimal("0")
+            for item in request.order_items:
+                entry = prices.get(item.menu_item_id)
+                if entry is None:
+                    raise HTTPException(status_code=400, detail="One or more menu items not found")
+                price, is_available = entry
+                if not availability.is_available(request.restaurant_id, item.menu_item_id, is_available):
+                    raise HTTPException(status_code=400, detail=f"Menu item {item.menu_item_id} is not available")
+                lines.append((item.menu_item_id, item.quantity, price))
+                total_amount += price * item.quantity
+
+            # One INSERT ... RETURNING for the order, one multi-row INSERT
+            # for its items, one commit
+            status = "pending"
+            result = await session.execute(
+                insert(Orders).values(
+                    restaurant_id=request.restaurant_id,
+                    table_number=request.table_number,
+                    total_amount=total_amount,
+                    status=status,
+                ).returning(Orders.id, Orders.created_at)
+            )
+            order_id, created_at = result.one()
+
+            await session.execute(
+                insert(OrderItem),
+                [
+                    {
+                        "order_id": order_id,
+                        "order_created_at": created_at,
+                        "menu_item_id": menu_item_id,
+                        "quantity": quantity,
+                        "price": price,
+                    }
+                    for menu_item_id, quantity, price in lines
+                ],
+            )
+            await record_order_sales(session, request.restaurant_id, created_at, lines)
+            await session.commit()
+
+            # No item lines: order_items is unbounded and a NOTIFY payload past
+            # 8000 bytes fails. Kitchens load the lines from the order history
+            await publish_order_event("order.created", {
+                "order_id": order_id,
+                "restaurant_id": request.restaurant_id,
+                "table_number": request.table_number,
+                "status": status,
+                "version": 1,
+                "total_amount": total_amount,
+                "created_at": created_at,
+                "items_count": len(lines),
+            })
+
+            return FastJSONResponse({
+                "order_id": order_id,
+                "created_at": created_at,
+                "status": status,
+                "total_amount": total_amount,
+                "items_count": len(lines)
+            })
+
+        except HTTPException:
+            await session.rollback()
+            raise
+        except SQLAlchemyError as e:
+            await session.rollback()
+            raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+        except Exception as e:
+            await session.rollback()
+            raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
 
 def create_base_router() -> APIRouter:
     router = APIRouter()
 
-    @router.get("/menu-items/{restaurant_id}")
+    @router.get("/menu-items/{restaurant_id}", response_model=list[MenuItemOut])
     async def get_menu_items(restaurant_id: int, request: Request):
-        await db_manager.initialize()
+        # Read the version before querying: if a write bumps it meanwhile,
+        # whatever we cache below lands under the old version and is never served
+        version = await menu_cache.version(restaurant_id)
+        cached = await menu_cache.get(restaurant_id, version)
+        if cached is not None:
+            cached = availability.merge(restaurant_id, cached)
+            return cached_json_response(request, cached.body, cached.etag)
+
         async_session = await db_manager.get_session()
 
         async with async_session() as session:
-            # Query menu items with their category using selectinload
-            query = select(MenuItem).options(selectinload(MenuItem.category)) \
-                                   .where(MenuItem.restaurant_id == restaurant_id)
+            # Only the columns the response needs, category name via join;
+            # rows are plain tuples so no ORM identity map or hydration
+            query = (
+                select(
+                    MenuItem.id,
+                    MenuItem.name,
+                    MenuItem.price,
+                    MenuItem.description,
+                    MenuItem.image_url,
+                    MenuItem.is_available,
+                    MenuCategory.name,
+                )
+                .outerjoin(MenuCategory, MenuItem.category_id == MenuCategory.id)
+                .where(MenuItem.restaurant_id == restaurant_id)
+                .order_by(MenuItem.id)
+            )
             result = await session.execute(query)
-            menu_items = result.scalars().all()
-
-        # Format response
-        items_response = []
-        for item in menu_items:
-            items_response.append({
-                "id": item.id,
-                "name": item.name,
-                "price": str(item.price),
-                "description": item.description,
-                "image_url": item.image_url,
-                "is_available": item.is_available,
-                "category": {
-                    "name": item.category.name if item.category else None
-                }
-            })
+            items = [
+                MenuItemOut.model_construct(
+                    id=item_id,
+                    name=name,
+                    price=price,
+                    description=description,
+                    image_url=image_url,
+                    is_available=is_available,
+                    category=MenuCategoryRef.model_construct(name=category_name),
+                )
+                for item_id, name, price, description, image_url, is_available, category_name in result
+            ]
+
+        cached = await menu_cache.put(restaurant_id, version, menu_items_adapter.dump_json(items))
+        cached = availability.merge(restaurant_id, cached)
+        return cached_json_response(request, cached.body, cached.etag)
+
+    @router.get("/menu-items/{restaurant_id}/availability")
+    async def get_availability(restaurant_id: int, since: Optional[int] = None):
+        """
+        Availability only. With ?since=<seq from a previous response> this is
+        just what changed; without it, or if the change log doesn't reach
+        back that far, the full list ("full": true).
+        """
+        overlay = availability.get(restaurant_id)
+        if overlay is None:
+            # Nothing toggled here since the board started. Not "now": a
+            # toggle still in flight must land after the seq we hand out
+            seq = availability.floor
+            changes = {} if since is not None and since >= availability.floor else None
+        else:
+            seq = overlay.seq
+            changes = overlay.changes_since(since) if since is not None else None
+        full = changes is None
+        if full:
+            async_session = await db_manager.get_session()
+            async with async_session() as session:
+                prices = await get_price_index(session, restaurant_id)
+            changes = {
+                item_id: is_available if overlay is None else overlay.get(item_id, is_available)
+                for item_id, (_, is_available) in prices.items()
+            }
+        return FastJSONResponse({
+            "restaurant_id": restaurant_id,
+            "seq": seq,
+            "full": full,
+            "available": [item_id for item_id, value in changes.items() if value],
+            "unavailable": [item_id for item_id, value in changes.items() if not value],
+        }, headers={"Cache-Control": "no-cache"})
+
+    @router.get("/menu-items/{restaurant_id}/availability/stream")
+    async def availability_stream(restaurant_id: int):
+        """Server-Sent Events: menu.availability deltas as kitchens toggle items."""
+        return StreamingResponse(
+            sse_stream(broadcaster, menu_topic(restaurant_id)),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    @router.post("/restaurants/{restaurant_id}/availability")
+    async def set_availability(
+        restaurant_id: int,
+        body: AvailabilityUpdate,
+        current_user: CurrentUser = Depends(get_current_user),
+    ):
+        """Mark items sold out / back without touching the cached menu."""
+        await ensure_owner(current_user, restaurant_id)
+        changes = {item_id: True for item_id in body.available}
+        changes.update({item_id: False for item_id in body.unavailable})
+        if not changes:
+            raise HTTPException(status_code=422, detail="No items given")
 
-        return items_response
+        async_session = await db_manager.get_session()
+        async with async_session() as session:
+            prices = await get_price_index(session, restaurant_id)
+        unknown = sorted(set(changes).difference(prices))
+        if unknown:
+            raise HTTPException(status_code=404, detail=f"Menu items not found: {unknown}")
+
+        try:
+            await publish_availability(restaurant_id, changes)
+        except Exception as e:
+            raise HTTPException(status_code=503, detail=f"Could not publish availability: {str(e)}")
+        availability_writer.schedule(restaurant_id, changes)
+        return FastJSONResponse({"restaurant_id": restaurant_id, "changed": len(changes)})
     
     # @router.post("/place-order/{restaurant_id}")
     # async def place_order(restaurant_id: int, order_data: dict):
@@ -117,72 +428,31 @@ def create_base_router() -> APIRouter:
 
 
     @router.post("/orders")
-    async def post_orders(request: OrderRequestBody):
-        await db_manager.initialize()
-        async_session = await db_manager.get_session()
-        
-        async with async_session() as session:
-            try:
-                # Validate menu items exist
-                menu_item_ids = [item.menu_item_id for item in request.order_items]
-                result = await session.execute(select(MenuItem).where(MenuItem.id.in_(menu_item_ids)))
-                existing_items = result.scalars().all()
-                if len(existing_items) != len(menu_item_ids):
-                    raise HTTPException(status_code=400, detail="One or more menu items not found")
-
-                # Create the main order
-                new_order = Orders(
-                    restaurant_id=request.restaurant_id,
-                    table_number=request.table_number,
-                    total_amount=request.total_amount,
-                    status=request.status or "pending"
-                )
-
-                # Add order to session and flush to get ID
-                session.add(new_order)
-                await session.commit()
-                await session.flush()
-                await session.refresh(new_order)
-                # Ensure we have the ID before proceeding
-                if new_order.id is None:
-                    raise HTTPException(status_code=500, detail="Failed to generate order ID")
-
-                # Create order items with explicit order_id
-                order_items = []
-                for item in request.order_items:
-                    order_item = OrderItem(
-                        order_id=new_order.id,
-                        menu_item_id=item.menu_item_id,
-                        quantity=item.quantity,
-                        price=item.price
-                    )
-                    order_items.append(order_item)
-                
-                # Add all order items
-                session.add_all(order_items)
-                
-                # Commit everything together
-                await session.commit()
-                
-                # Refresh to get the latest state
-                
-
-                return {
-                    "order_id": new_order.id,
-                    "created_at": new_order.created_at,
-                    "status": new_order.status,
-                    "items_count": len(order_items)
-                }
-
-            except HTTPException:
-                await session.rollback()
-                raise
-            except SQLAlchemyError as e:
-                await session.rollback()
-                raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
-            except Exception as e:
-                await session.rollback()
-                raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")   
+    async def post_orders(
+        request: OrderRequestBody,
+        idempotency_key: Optional[str] = Header(default=None, max_length=255),
+    ):
+        if idempotency_key is None:
+            return await place_order(request)
+
+        # Retries from flaky table Wi-Fi replay the first response instead of
+        # creating another order; concurrent duplicates wait for the first one
+        key = f"{request.restaurant_id}:{idempotency_key}"
+        fingerprint = hashlib.sha256(request.model_dump_json().encode()).hexdigest()
+        try:
+            response, replayed = await idempotency_store.run(
+                key, fingerprint, lambda: place_order(request)
+            )
+        except IdempotencyConflict:
+            raise HTTPException(status_code=422, detail="Idempotency-Key was already used with a different request")
+        if not replayed:
+            return response
+        return Response(
+            content=response.body,
+            status_code=response.status_code,
+            media_type="application/json",
+            headers={"Idempotent-Replayed": "true"},
+        )
     
 
 
@@ -191,7 +461,7 @@ def create_base_router() -> APIRouter:
     @router.post("/restaurants-with-menu")
     async def create_restaurant_with_menu(
     data: RestaurantCreate,
-    current_user: User = Depends(get_current_user)   # ✅ require auth
+    current_user: CurrentUser = Depends(get_current_user)   # ✅ require auth
 ):
         async_session = await db_manager.get_session()
         async with async_session() as session:
@@ -223,6 +493,9 @@ def create_base_router() -> APIRouter:
                     await session.execute(insert(MenuItem), menu_items_to_insert)
 
                 await session.commit()
+                await bump_menu(restaurant_id)
+                # The owner's restaurant list changed
+                user_cache.invalidate(current_user.email)
 
                 return {
                     "restaurant_id": restaurant_id,
@@ -235,43 +508,342 @@ def create_base_router() -> APIRouter:
                 await session.rollback()
                 raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
 
-    @router.get("/get-categories")
-    async def get_categories():
-        await db_manager.initialize()
+    @router.patch("/restaurants/{restaurant_id}/menu")
+    async def patch_menu(
+        restaurant_id: int,
+        patch: MenuPatch,
+        current_user: CurrentUser = Depends(get_current_user),
+    ):
+        """Apply adds, updates and removals to a menu in one transaction."""
+        await ensure_owner(current_user, restaurant_id)
+        update_ids = [item.id for item in patch.update]
+        if len(set(update_ids)) != len(update_ids) or set(update_ids) & set(patch.remove):
+            raise HTTPException(status_code=422, detail="Each item may be updated or removed only once")
+
         async_session = await db_manager.get_session()
+        async with async_session() as session:
+            try:
+                # One lookup checks every referenced item belongs here
+                touched = set(update_ids) | set(patch.remove)
+                if touched:
+                    found = set(await session.scalars(
+                        select(MenuItem.id).where(MenuItem.id.in_(touched), MenuItem.restaurant_id == restaurant_id)
+                    ))
+                    if touched - found:
+                        raise HTTPException(status_code=404, detail=f"Menu items not found: {sorted(touched - found)}")
+
+                if patch.remove:
+                    # Order lines cascade from menu items: never drop sales history
+                    ordered = sorted(set(await session.scalars(
+                        select(OrderItem.menu_item_id).where(OrderItem.menu_item_id.in_(patch.remove)).distinct()
+                    )))
+                    if ordered:
+                        raise HTTPException(
+                            status_code=409,
+                            detail=f"Menu items {ordered} have orders; mark them unavailable instead",
+                        )
+                    await session.execute(
+                        delete(MenuItem).where(MenuItem.id.in_(patch.remove), MenuItem.restaurant_id == restaurant_id)
+                    )
+
+                # is_available goes through availability_writer like every
+                # other toggle, so a queued toggle can't overwrite it later
+                updates = [item.model_dump(exclude_unset=True, exclude={"is_available"}) for item in patch.update]
+                updates = [values for values in updates if len(values) > 1]
+                if updates:
+                    # ORM bulk UPDATE by primary key: rows are grouped by the
+                    # columns they set and sent as one executemany per group
+                    await session.execute(
+                        update(MenuItem).where(MenuItem.restaurant_id == restaurant_id),
+                        updates,
+                        execution_options={"synchronize_session": None},
+                    )
+
+                added = []
+                if patch.add:
+                    result = await session.execute(
+                        insert(MenuItem).returning(MenuItem.id, sort_by_parameter_order=True),
+                        [{"restaurant_id": restaurant_id, **item.model_dump()} for item in patch.add],
+                    )
+                    added = list(result.scalars())
 
+                await session.commit()
+            except HTTPException:
+                await session.rollback()
+                raise
+            except SQLAlchemyError as e:
+                await session.rollback()
+                raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+        # Only this restaurant's cached menu and price index go stale
+        version = await bump_menu(restaurant_id)
+        # Replaces any toggle still queued for these items, then reaches
+        # every worker's overlay like POST /availability does
+        toggled = {item.id: item.is_available for item in patch.update if "is_available" in item.model_fields_set}
+        if toggled:
+            availability_writer.schedule(restaurant_id, toggled)
+            try:
+                await publish_availability(restaurant_id, toggled)
+            except Exception as e:
+                print(f"failed to publish availability for restaurant {restaurant_id}: {e}")
+        return FastJSONResponse({
+            "restaurant_id": restaurant_id,
+            "version": version,
+            "added": added,
+            "updated": len(patch.update),
+            "removed": len(patch.remove),
+        })
+
+    @router.post("/restaurants/{restaurant_id}/menu-import")
+    async def import_menu(
+        request: Request,
+        restaurant_id: int,
+        format: Optional[str] = None,
+        current_user: CurrentUser = Depends(get_current_user),
+    ):
+        """
+        Stream a CSV (header row) or JSONL menu into the restaurant, one item
+        per row. Invalid rows are skipped and reported; the import is
+        all-or-nothing otherwise.
+        """
+        await ensure_owner(current_user, restaurant_id)
+        format = format or ("jsonl" if "json" in request.headers.get("content-type", "") else "csv")
+        if format not in ("csv", "jsonl"):
+            raise HTTPException(status_code=422, detail="format must be csv or jsonl")
+
+        current = menu_imports.get(restaurant_id)
+        if current is not None and current.state == "running":
+            raise HTTPException(status_code=409, detail="An import is already running for this restaurant")
+        progress = ImportProgress(restaurant_id, format)
+        menu_imports[restaurant_id] = progress
+
+        lines = iter_lines(request.stream())
+        records = iter_csv_records(lines) if format == "csv" else iter_jsonl_records(lines)
+        async_session = await db_manager.get_session()
         async with async_session() as session:
-            stmt = select(MenuCategory).order_by(MenuCategory.sort_order, MenuCategory.name)
-            result = await session.execute(stmt)
-            categories = result.scalars().all()
-            return [
-                {"id": c.id, "name": c.name}
-                for c in categories
-            ]
+            try:
+                await MenuImporter(session, progress).run(records)
+                await session.commit()
+                progress.state = "done"
+            except ImportAborted as e:
+                await session.rollback()
+                progress.state = "failed"
+                progress.errors.append({"line": None, "error": str(e)})
+                raise HTTPException(status_code=422, detail=progress.as_dict())
+            except Exception as e:
+                await session.rollback()
+                progress.state = "failed"
+                raise HTTPException(status_code=500, detail=f"Import failed: {str(e)}")
+            finally:
+                progress.finished_at = time.time()
+
+        await bump_menu(restaurant_id)
+        if progress.categories_created:
+            menu_cache.invalidate_categories()
+        return FastJSONResponse(progress.as_dict())
+
+    @router.get("/restaurants/{restaurant_id}/menu-import")
+    async def get_menu_import(restaurant_id: int, current_user: CurrentUser = Depends(get_current_user)):
+        """Progress of the running (or last) menu import."""
+        await ensure_owner(current_user, restaurant_id)
+        progress = menu_imports.get(restaurant_id)
+        if progress is None:
+            raise HTTPException(status_code=404, detail="No import for this restaurant")
+        return FastJSONResponse(progress.as_dict())
+
+    @router.get("/get-categories")
+    async def get_categories(request: Request):
+        cached = menu_cache.get_categories()
+        if cached is None:
+            async_session = await db_manager.get_session()
+
+            async with async_session() as session:
+                stmt = select(MenuCategory).order_by(MenuCategory.sort_order, MenuCategory.name)
+                result = await session.execute(stmt)
+                categories = result.scalars().all()
+                cached = menu_cache.put_categories(json.dumps([
+                    {"id": c.id, "name": c.name}
+                    for c in categories
+                ]).encode())
+        return cached_json_response(request, cached.body, cached.etag)
     
 
 
 
     @router.get("/generate-qr/{restaurant_id}")
-    async def generate_qr(restaurant_id: int,
-                        #   current_user: User = Depends(get_current_user) 
-                        ):
-
+    async def generate_qr(request: Request, restaurant_id: int, table: Optional[int] = None):
+        """PNG QR code for the restaurant's order page, optionally for one table."""
         try:
-            # 👇 Encode your restaurant_id into a customer-facing URL
-            data = f"http://localhost:3000/order/{restaurant_id}"  # Local link for now
+            data = qr_url(restaurant_id, table)
+            etag = qr_etag(qr_key(data))
+            headers = {"ETag": etag, "Cache-Control": QR_CACHE_CONTROL}
+            if etag_matches(request.headers.get("if-none-match"), etag):
+                return Response(status_code=304, headers=headers)
 
-            # 👇 Generate QR Code
-            qr = qrcode.make(data)
-            buf = io.BytesIO()
-            qr.save(buf, format="PNG")
-            buf.seek(0)
-
-            # 👇 Return PNG image
-            return StreamingResponse(buf, media_type="image/png")
+            png, _ = await qr_cache.get(data)
+            return Response(content=png, media_type="image/png", headers=headers)
 
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Error generating QR: {str(e)}")
 
+    @router.get("/generate-qr/{restaurant_id}/tables.zip")
+    async def generate_table_qrs(
+        restaurant_id: int,
+        tables: int = Query(gt=0, le=QR_MAX_TABLES),
+        current_user: CurrentUser = Depends(get_current_user),
+    ):
+        """Every table's QR code (1..tables) as one streamed ZIP."""
+        await ensure_owner(current_user, restaurant_id)
+        return StreamingResponse(
+            qr_zip_stream(qr_cache, restaurant_id, tables),
+            media_type="application/zip",
+            headers={"Content-Disposition": f'attachment; filename="restaurant_{restaurant_id}_qr.zip"'},
+        )
+
+    @router.get("/restaurants/{restaurant_id}/orders")
+    async def list_orders(
+        restaurant_id: int,
+        limit: int = Query(ORDER_PAGE_SIZE, gt=0, le=ORDER_PAGE_MAX),
+        cursor: Optional[str] = None,
+        status: Optional[str] = None,
+        table_number: Optional[int] = None,
+        current_user: CurrentUser = Depends(get_current_user),
+    ):
+        """Order history, newest first. Pass next_cursor back as ?cursor= for the next page."""
+        await ensure_owner(current_user, restaurant_id)
+        if status is not None and status not in ORDER_STATUSES:
+            raise HTTPException(status_code=422, detail=f"Unknown status {status!r}")
+
+        async_session = await db_manager.get_session()
+        async with async_session() as session:
+            try:
+                orders, items, next_cursor = await load_order_page(
+                    session, restaurant_id, limit, cursor, status, table_number
+                )
+            except InvalidCursor:
+                raise HTTPException(status_code=422, detail="Invalid cursor")
+            except SQLAlchemyError as e:
+                raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+        return StreamingResponse(
+            stream_order_page(restaurant_id, orders, items, next_cursor),
+            media_type="application/json",
+        )
+
+    @router.get("/restaurants/{restaurant_id}/reports/sales")
+    async def sales_report(
+        restaurant_id: int,
+        group: str = "hour",
+        start: Optional[datetime.datetime] = None,
+        end: Optional[datetime.datetime] = None,
+        current_user: CurrentUser = Depends(get_current_user),
+    ):
+        """Revenue by hour, item or category over [start, end), default the last 7 days."""
+        await ensure_owner(current_user, restaurant_id)
+        if group not in REPORT_GROUPS:
+            raise HTTPException(status_code=422, detail=f"group must be one of {', '.join(REPORT_GROUPS)}")
+        # Comparing an aware bound with a naive column fails in asyncpg
+        end = as_naive_utc(end) if end else as_naive_utc(datetime.datetime.now(datetime.timezone.utc))
+        start = as_naive_utc(start) if start else end - datetime.timedelta(days=7)
+
+        async_session = await db_manager.get_session()
+        async with async_session() as session:
+            try:
+                rows = await load_sales_report(session, restaurant_id, group, start, end)
+            except SQLAlchemyError as e:
+                raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+        if group == "hour":
+            results = [{"hour": hour, "quantity": quantity, "revenue": revenue} for hour, quantity, revenue in rows]
+        elif group == "item":
+            results = [
+                {"menu_item_id": item_id, "name": name, "quantity": quantity, "revenue": revenue}
+                for item_id, name, quantity, revenue in rows
+            ]
+        else:
+            results = [
+                {"category_id": category_id, "name": name, "quantity": quantity, "revenue": revenue}
+                for category_id, name, quantity, revenue in rows
+            ]
+        return FastJSONResponse({
+            "restaurant_id": restaurant_id,
+            "group": group,
+            "start": start,
+            "end": end,
+            "total_revenue": sum((row["revenue"] for row in results), Decimal("0")),
+            "results": results,
+        })
+
+    @router.post("/restaurants/{restaurant_id}/orders/status")
+    async def update_orders_status(
+        restaurant_id: int,
+        body: OrderStatusUpdate,
+        current_user: CurrentUser = Depends(get_current_user),
+    ):
+        """Move many orders to one status in a single statement (kitchen bulk bump)."""
+        await ensure_owner(current_user, restaurant_id)
+        orders = {order.order_id: order.version for order in body.orders}
+        updated, rejected = await change_order_status(restaurant_id, body.status, orders)
+        return FastJSONResponse({
+            "status": body.status,
+            "updated": [
+                {"order_id": order.order_id, "version": order.version}
+                for order in updated
+            ],
+            "rejected": [
+                {"order_id": order_id, "reason": reason}
+                for order_id, reason in rejected.items()
+            ],
+        })
+
+    @router.patch("/restaurants/{restaurant_id}/orders/{order_id}/status")
+    async def update_order_status(
+        restaurant_id: int,
+        order_id: int,
+        body: OrderStatusChange,
+        current_user: CurrentUser = Depends(get_current_user),
+    ):
+        await ensure_owner(current_user, restaurant_id)
+        updated, rejected = await change_order_status(restaurant_id, body.status, {order_id: body.version})
+        if rejected:
+            reason = rejected[order_id]
+            raise HTTPException(status_code=404 if reason == "not found" else 409, detail=reason)
+        order = updated[0]
+        return FastJSONResponse({"order_id": order.order_id, "status": order.status, "version": order.version})
+
+    @router.get("/kitchen/{restaurant_id}/stream")
+    async def kitchen_stream(restaurant_id: int, current_user: CurrentUser = Depends(get_stream_user)):
+        """Server-Sent Events feed of new orders and status changes for a kitchen."""
+        await ensure_owner(current_user, restaurant_id)
+        return StreamingResponse(
+            sse_stream(broadcaster, restaurant_topic(restaurant_id)),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    @router.websocket("/orders/{order_id}/ws")
+    async def order_status_ws(websocket: WebSocket, order_id: int, restaurant_id: int, table_number: int):
+        """Live status of one order for the table that placed it, instead of polling."""
+        # Subscribe before reading the snapshot so no update slips in between
+        subscription = broadcaster.subscribe(restaurant_topic(restaurant_id), key=order_id)
+        try:
+            snapshot = await get_order_status(order_id, restaurant_id, table_number)
+            if snapshot is None:
+                await websocket.close(code=1008)
+                return
+            await websocket.accept()
+            await websocket.send_text(dumps(snapshot).decode())
+            await websocket_stream(
+                websocket,
+                subscription,
+                lambda: get_order_status(order_id, restaurant_id, table_number),
+            )
+        finally:
+            broadcaster.unsubscribe(subscription)
+
+    @router.get("/internal/pool-metrics", include_in_schema=False, dependencies=[Depends(require_internal_token)])
+    async def pool_metrics():
+        return db_manager.pool_metrics()
+
     return router
 
@@ -0,0 +1,106 @@
+import datetime
+from sqlalchemy import Integer, func, literal, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from database.model import MenuCategory, MenuItem, OrderItem, SalesHourly
+
+REPORT_GROUPS = ("hour", "item", "category")
+
+
+def as_naive_utc(value: datetime.datetime) -> datetime.datetime:
+    """Rollup hours are TIMESTAMP WITHOUT TIME ZONE in UTC; drop any offset after converting."""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+
+
+def _upsert(stmt):
+    """Add quantity/revenue into existing rollup rows (negative amounts subtract)."""
+    return stmt.on_conflict_do_update(
+        index_elements=[SalesHourly.restaurant_id, SalesHourly.hour, SalesHourly.menu_item_id],
+        set_={
+            "quantity": SalesHourly.quantity + stmt.excluded.quantity,
+            "revenue": SalesHourly.revenue + stmt.excluded.revenue,
+        },
+    )
+
+
+async def record_order_sales(session, restaurant_id: int, created_at: datetime.datetime, lines):
+    """
+    Add an order's lines [(menu_item_id, quantity, price)] to the rollup, in
+    the order's own transaction. Rows are upserted in menu_item_id order so
+    concurrent orders lock them in the same order and never deadlock.
+    """
+    hour = created_at.replace(minute=0, second=0, microsecond=0)
+    totals = {}
+    for menu_item_id, quantity, price in lines:
+        # One row per item: ON CONFLICT can't touch the same row twice
+        total_quantity, revenue = totals.get(menu_item_id, (0, 0))
+        totals[menu_item_id] = (total_quantity + quantity, revenue + quantity * price)
+    await session.execute(_upsert(pg_insert(SalesHourly).values([
+        {
+            "restaurant_id": restaurant_id,
+            "hour": hour,
+            "menu_item_id": menu_item_id,
+            "quantity": quantity,
+            "revenue": revenue,
+        }
+        for menu_item_id, (quantity, revenue) in sorted(totals.items())
+    ])))
+
+
+async def reverse_order_sales(session, restaurant_id: int, orders):
+    """Take cancelled orders [(order_id, created_at)] back out of the rollup."""
+    if not orders:
+        return
+    hour = func.date_trunc("hour", OrderItem.order_created_at)
+    lines = (
+        select(
+            literal(restaurant_id, Integer),
+            hour,
+            OrderItem.menu_item_id,
+            -func.sum(OrderItem.quantity),
+            -func.sum(OrderItem.quantity * OrderItem.price),
+        )
+        .where(
+            OrderItem.order_id.in_([order_id for order_id, _ in orders]),
+            OrderItem.order_created_at.in_([created_at for _, created_at in orders]),
+        )
+        .group_by(hour, OrderItem.menu_item_id)
+        .order_by(hour, OrderItem.menu_item_id)
+    )
+    await session.execute(_upsert(
+        pg_insert(SalesHourly).from_select(
+            ["restaurant_id", "hour", "menu_item_id", "quantity", "revenue"], lines
+        )
+    ))
+
+
+async def load_sales_report(session, restaurant_id: int, group: str, start: datetime.datetime, end: datetime.datetime):
+    """Revenue and quantity in [start, end) grouped by hour, item or category, from the rollup only."""
+    revenue = func.sum(SalesHourly.revenue).label("revenue")
+    quantity = func.sum(SalesHourly.quantity).label("quantity")
+    if group == "hour":
+        query = select(SalesHourly.hour, quantity, revenue).group_by(SalesHourly.hour).order_by(SalesHourly.hour)
+    elif group == "item":
+        query = (
+            select(SalesHourly.menu_item_id, MenuItem.name, quantity, revenue)
+            .select_from(SalesHourly)
+            .join(MenuItem, MenuItem.id == SalesHourly.menu_item_id)
+            .group_by(SalesHourly.menu_item_id, MenuItem.name)
+            .order_by(revenue.desc())
+        )
+    else:
+        query = (
+            select(MenuCategory.id, MenuCategory.name, quantity, revenue)
+            .select_from(SalesHourly)
+            .join(MenuItem, MenuItem.id == SalesHourly.menu_item_id)
+            .outerjoin(MenuCategory, MenuCategory.id == MenuItem.category_id)
+            .group_by(MenuCategory.id, MenuCategory.name)
+            .order_by(revenue.desc())
+        )
+    query = query.where(
+        SalesHourly.restaurant_id == restaurant_id,
+        SalesHourly.hour >= start,
+        SalesHourly.hour < end,
+    )
+    return (await session.execute(query)).all()
@@ -1,20 +1,21 @@
 from pydantic import BaseModel
 from typing import Optional
 
+from decimal import Decimal
 from typing import List, Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, TypeAdapter
 
 class MenuItemList(BaseModel):
     menu_item_id: int
-    quantity: int
-    price: float  # Use float for money/price in request body
+    quantity: int = Field(gt=0)
+    price: Optional[float] = None  # ignored: line prices come from the menu
 
 class OrderRequestBody(BaseModel):
     order_id : Optional[int] = None
     restaurant_id: int
     table_number: int
-    total_amount: float
-    status: Optional[str] = "pending"
+    total_amount: Optional[float] = None  # ignored: computed server-side
+    status: Optional[str] = "pending"  # ignored: new orders always start pending
     order_items: List[MenuItemList]  # ✅ Correct type hint
 
 
@@ -27,8 +28,63 @@ class MenuItemCreate(BaseModel):
     image_url: Optional[str] = None
     is_available: bool = True
 
+class MenuItemImport(MenuItemCreate):
+    """One row of a CSV/JSONL menu import."""
+    name: str = Field(min_length=1, max_length=100)
+    price: Decimal = Field(gt=0, max_digits=10, decimal_places=2)
+    category: Optional[str] = Field(default=None, max_length=100)  # name; created if new
+
+class MenuItemUpdate(BaseModel):
+    """Fields left out are unchanged; name, price and is_available can't be null."""
+    id: int
+    name: str = Field(default=None, min_length=1, max_length=100)
+    description: Optional[str] = None
+    price: Decimal = Field(default=None, gt=0, max_digits=10, decimal_places=2)
+    category_id: Optional[int] = None
+    image_url: Optional[str] = None
+    is_available: bool = None
+
+class MenuPatch(BaseModel):
+    add: List[MenuItemCreate] = []
+    update: List[MenuItemUpdate] = []
+    remove: List[int] = []
+
+class AvailabilityUpdate(BaseModel):
+    available: List[int] = []
+    unavailable: List[int] = []
+
 class RestaurantCreate(BaseModel):
     name: str
     address: Optional[str] = None
     phone: Optional[str] = None
-    menu_items: List[MenuItemCreate] = []
\ No newline at end of file
+    menu_items: List[MenuItemCreate] = []
+
+
+# Order lifecycle
+class OrderStatusTarget(BaseModel):
+    order_id: int
+    version: Optional[int] = None  # expected version; omit to skip the check
+
+class OrderStatusUpdate(BaseModel):
+    status: str
+    orders: List[OrderStatusTarget] = Field(min_length=1, max_length=1000)
+
+class OrderStatusChange(BaseModel):
+    status: str
+    version: Optional[int] = None
+
+
+# Menu listing response (built straight from projected row tuples)
+class MenuCategoryRef(BaseModel):
+    name: Optional[str] = None
+
+class MenuItemOut(BaseModel):
+    id: int
+    name: str
+    price: Decimal  # serialized as a string, e.g. "12.50"
+    description: Optional[str] = None
+    image_url: Optional[str] = None
+    is_available: bool
+    category: MenuCategoryRef
+
+menu_items_adapter = TypeAdapter(List[MenuItemOut])
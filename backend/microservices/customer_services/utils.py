@@ -1,16 +1,2 @@
-
-from passlib.context import CryptContext
-from jose import JWTError, jwt
-from datetime import datetime, timedelta
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-SECRET_KEY = "your_secret_key_here"   # ⚠️ keep in env var
-ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = 60
-
-def decode_access_token(token: str):
-    try:
-        return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-    except JWTError:
-        return None
\ No newline at end of file
+# JWT handling lives in microservices/common/auth.py, shared with auth_services
+from microservices.common.auth import ALGORITHM, SECRET_KEY, decode_access_token
@@ -0,0 +1,175 @@
+import asyncio
+import pytest
+from microservices.customer_services.idempotency import IdempotencyConflict, IdempotencyStore
+
+
+def make_handler(calls: list, result="ok", error: Exception | None = None, release: asyncio.Event | None = None):
+    async def handler():
+        calls.append(1)
+        if release is not None:
+            await release.wait()
+        else:
+            await asyncio.sleep(0.01)
+        if error is not None:
+            raise error
+        return result
+    return handler
+
+
+def test_concurrent_duplicates_run_handler_once():
+    async def main():
+        store = IdempotencyStore()
+        calls = []
+        handler = make_handler(calls, result={"order_id": 1})
+        results = await asyncio.gather(*[store.run("k", "body", handler) for _ in range(20)])
+        return calls, results, store
+
+    calls, results, store = asyncio.run(main())
+    assert len(calls) == 1
+    assert all(result == {"order_id": 1} for result, _ in results)
+    assert [replayed for _, replayed in results].count(False) == 1
+    assert len(store) == 1
+
+
+def test_retry_after_completion_is_replayed():
+    async def main():
+        store = IdempotencyStore()
+        calls = []
+        first = await store.run("k", "body", make_handler(calls))
+        second = await store.run("k", "body", make_handler(calls))
+        return calls, first, second
+
+    calls, first, second = asyncio.run(main())
+    assert len(calls) == 1
+    assert first == ("ok", False)
+    assert second == ("ok", True)
+
+
+def test_failure_reaches_duplicates_and_is_forgotten():
+    async def main():
+        store = IdempotencyStore()
+        calls = []
+        handler = make_handler(calls, error=ValueError("boom"))
+        results = await asyncio.gather(*[store.run("k", "body", handler) for _ in range(5)], return_exceptions=True)
+        assert len(store) == 0
+        retried = await store.run("k", "body", make_handler(calls))
+        return calls, results, retried
+
+    calls, results, retried = asyncio.run(main())
+    assert all(isinstance(result, ValueError) for result in results)
+    # One failed attempt, then the retry runs the handler again
+    assert len(calls) == 2
+    assert retried == ("ok", False)
+
+
+def test_cancelled_request_is_forgotten():
+    async def main():
+        store = IdempotencyStore()
+        calls = []
+        release = asyncio.Event()
+        original = asyncio.create_task(store.run("k", "body", make_handler(calls, release=release)))
+        await asyncio.sleep(0)
+        original.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await original
+        assert len(store) == 0
+        retried = await store.run("k", "body", make_handler(calls))
+        return calls, retried
+
+    calls, retried = asyncio.run(main())
+    assert len(calls) == 2
+    assert retried == ("ok", False)
+
+
+def test_duplicates_take_over_a_cancelled_request():
+    async def main():
+        store = IdempotencyStore()
+        calls = []
+        release = asyncio.Event()
+        original = asyncio.create_task(store.run("k", "body", make_handler(calls, release=release)))
+        await asyncio.sleep(0)
+        duplicates = [asyncio.create_task(store.run("k", "body", make_handler(calls))) for _ in range(2)]
+        await asyncio.sleep(0)
+        original.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await original
+        results = await asyncio.gather(*duplicates)
+        return calls, results, await store.run("k", "body", make_handler(calls))
+
+    calls, results, retried = asyncio.run(main())
+    # One duplicate runs the handler again, the other joins it
+    assert len(calls) == 2
+    assert sorted(results) == [("ok", False), ("ok", True)]
+    assert retried == ("ok", True)
+
+
+def test_cancelled_duplicate_does_not_cancel_original():
+    async def main():
+        store = IdempotencyStore()
+        calls = []
+        release = asyncio.Event()
+        original = asyncio.create_task(store.run("k", "body", make_handler(calls, release=release)))
+        await asyncio.sleep(0)
+        duplicate = asyncio.create_task(store.run("k", "body", make_handler(calls)))
+        await asyncio.sleep(0)
+        duplicate.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await duplicate
+        release.set()
+        return calls, await original
+
+    calls, result = asyncio.run(main())
+    assert len(calls) == 1
+    assert result == ("ok", False)
+
+
+def test_different_body_conflicts():
+    async def main():
+        store = IdempotencyStore()
+        calls = []
+        release = asyncio.Event()
+        original = asyncio.create_task(store.run("k", "body", make_handler(calls, release=release)))
+        await asyncio.sleep(0)
+        with pytest.raises(IdempotencyConflict):
+            await store.run("k", "other body", make_handler(calls))
+        release.set()
+        await original
+        with pytest.raises(IdempotencyConflict):
+            await store.run("k", "other body", make_handler(calls))
+        return calls
+
+    assert len(asyncio.run(main())) == 1
+
+
+def test_max_keys_never_evicts_running_requests():
+    async def main():
+        store = IdempotencyStore(max_keys=2)
+        calls = []
+        release = asyncio.Event()
+        running = asyncio.create_task(store.run("running", "body", make_handler(calls, release=release)))
+        await asyncio.sleep(0)
+        for key in ("a", "b", "c"):
+            await store.run(key, "body", make_handler(calls))
+        # "running" is the oldest key but still in flight, so it survives the cap
+        duplicate = asyncio.create_task(store.run("running", "body", make_handler(calls)))
+        await asyncio.sleep(0)
+        release.set()
+        return calls, await running, await duplicate, store
+
+    calls, first, duplicate, store = asyncio.run(main())
+    assert len(calls) == 4
+    assert first == ("ok", False)
+    assert duplicate == ("ok", True)
+    assert len(store) <= store.max_keys
+
+
+def test_expired_entries_are_purged():
+    async def main():
+        store = IdempotencyStore(ttl=0)
+        calls = []
+        await store.run("k", "body", make_handler(calls))
+        return calls, await store.run("k", "body", make_handler(calls))
+
+    calls, second = asyncio.run(main())
+    assert len(calls) == 2
+    assert second == ("ok", False)
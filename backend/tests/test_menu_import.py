@@ -0,0 +1,48 @@
+import asyncio
+import os
+import pytest
+from sqlalchemy import text
+
+pytestmark = pytest.mark.skipif(not os.getenv("DATABASE_URL"), reason="needs DATABASE_URL")
+
+
+async def records_then_abort(count: int):
+    from microservices.customer_services.menu_import import ImportAborted
+
+    for line in range(1, count + 1):
+        yield line, {"name": f"Dish {line}", "price": "4.50"}
+    raise ImportAborted("client went away")
+
+
+def test_aborted_import_writes_nothing():
+    from database.db_manager import AsyncDatabaseManager
+    from microservices.customer_services.menu_import import ImportAborted, ImportProgress, MenuImporter
+
+    async def main():
+        manager = AsyncDatabaseManager()
+        async with manager.engine.begin() as conn:
+            restaurant_id = (await conn.execute(
+                text("INSERT INTO app.restaurants (name) VALUES ('import test') RETURNING id")
+            )).scalar()
+        try:
+            progress = ImportProgress(restaurant_id, "jsonl")
+            async_session = await manager.get_session()
+            async with async_session() as session:
+                # Chunks of 2: two COPYs reach the database before the abort
+                with pytest.raises(ImportAborted):
+                    await MenuImporter(session, progress, chunk_size=2).run(records_then_abort(5))
+                await session.rollback()
+            async with manager.engine.connect() as conn:
+                written = (await conn.execute(
+                    text("SELECT count(*) FROM app.menu_items WHERE restaurant_id = :rid"), {"rid": restaurant_id}
+                )).scalar()
+            return progress.imported, written
+        finally:
+            async with manager.engine.begin() as conn:
+                await conn.execute(text("DELETE FROM app.menu_items WHERE restaurant_id = :rid"), {"rid": restaurant_id})
+                await conn.execute(text("DELETE FROM app.restaurants WHERE id = :rid"), {"rid": restaurant_id})
+            await manager.dispose()
+
+    imported, written = asyncio.run(main())
+    assert imported == 4
+    assert written == 0
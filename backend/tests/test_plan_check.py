@@ -0,0 +1,43 @@
+import asyncio
+import os
+import pytest
+from sqlalchemy import text
+
+pytestmark = pytest.mark.skipif(not os.getenv("DATABASE_URL"), reason="needs DATABASE_URL")
+
+
+async def hot_query_indexes() -> dict:
+    from database.db_manager import AsyncDatabaseManager
+    from database.migrations.plan_check import HOT_QUERIES, plan_indexes
+
+    manager = AsyncDatabaseManager(statement_timeout_ms=0)
+    try:
+        async with manager.engine.connect() as conn:
+            await conn.begin()
+            # Rolled back below. On empty partitions every index costs the
+            # same and the planner's pick is arbitrary; with real pages the
+            # wrong index is visibly more expensive
+            restaurant_id = (await conn.execute(
+                text("INSERT INTO app.restaurants (name) VALUES ('plan check') RETURNING id")
+            )).scalar()
+            await conn.execute(text(
+                "INSERT INTO app.orders (restaurant_id, table_number, total_amount, status, created_at) "
+                "SELECT :rid, g % 20, 10, CASE WHEN g % 100 = 0 THEN 'pending' ELSE 'served' END, "
+                "now() - make_interval(secs => g) FROM generate_series(1, 20000) g"
+            ), {"rid": restaurant_id})
+            await conn.execute(text("SET LOCAL enable_seqscan = off"))
+            found = {name: await plan_indexes(conn, sql) for name, (_, sql) in HOT_QUERIES.items()}
+            await conn.rollback()
+        return found
+    finally:
+        await manager.dispose()
+
+
+def test_hot_queries_use_their_indexes():
+    from database.migrations.plan_check import HOT_QUERIES
+
+    found = asyncio.run(hot_query_indexes())
+    for name, (index, _) in HOT_QUERIES.items():
+        seq_scans, indexes = found[name]
+        assert seq_scans == [], f"{name}: sequential scan on {seq_scans}"
+        assert index in indexes, f"{name}: expected {index}, plan uses {sorted(indexes)}"